@@ -0,0 +1,614 @@
+#!/usr/bin/env python3
+"""
+Google Data Extractor Benchmarks
+
+Measures the cost of the different GoogleDataExtractor fetch strategies.
+Usage: python benchmark_extractor.py formats [--messages 50]
+       python benchmark_extractor.py normalize [--messages 100000] [--corpus messages.jsonl]
+       python benchmark_extractor.py startup [--runs 5]
+       python benchmark_extractor.py offline [--messages 2000] [--latency-ms 20] [--error-rate 0.01]
+
+The offline benchmark needs no Google account: it starts fake_google_api.py
+in a subprocess and points the extractor's services at it.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Run in a fresh interpreter: import the extractor and authenticate, then report phase timings
+COLD_START_PROGRAM = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {script_dir!r})
+import extract_google_data
+imported = time.perf_counter()
+extractor = extract_google_data.GoogleDataExtractor()
+ok = extractor.authenticate()
+print(json.dumps({{
+    'ok': ok,
+    'import': imported - start,
+    'total': time.perf_counter() - start,
+    **extractor.startup_timings
+}}))
+"""
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+
+from extract_google_data import (
+    API_VERSIONS,
+    CALENDAR_EVENT_FIELDS,
+    GoogleDataExtractor,
+    TokenBucket,
+    load_discovery_document,
+)
+from gmail_normalize import normalize_email, parse_email_date
+
+# Date header variants observed in real mailboxes (Outlook, Gmail, mailing lists, bulk senders)
+SAMPLE_DATE_HEADERS = [
+    'Mon, 4 Mar 2024 09:15:02 +0100',
+    'Mon, 04 Mar 2024 08:15:02 +0000 (UTC)',
+    'Tue, 5 Mar 2024 14:01:44 GMT',
+    '5 Mar 2024 14:01:44 +0000',
+    'Wed, 06 Mar 2024 07:30:00 -0500 (EST)',
+    'Thu, 7 Mar 2024 22:10:09 +0100 (CET)',
+    'Fri, 08 Mar 2024 11:00:00 CET',
+    'Sat, 9 Mar 2024 06:45:12 -0000',
+    'Sun, 10 Mar 2024 18:20 +0200',
+    'Mon, 11 Mar 2024 12:00:00 +0100 (Romance Standard Time)',
+]
+
+# Non-essential headers typically present on a Gmail metadata response
+SAMPLE_FILLER_HEADERS = [
+    'Delivered-To', 'Received', 'X-Received', 'ARC-Seal', 'ARC-Message-Signature',
+    'ARC-Authentication-Results', 'Return-Path', 'Received-SPF', 'Authentication-Results',
+    'DKIM-Signature', 'X-Google-DKIM-Signature', 'MIME-Version', 'Message-ID', 'To',
+    'Content-Type', 'List-Unsubscribe', 'X-Mailer'
+]
+
+class CountingHttp:
+    """httplib2-compatible wrapper that records response sizes and timings"""
+
+    def __init__(self, http):
+        self.http = http
+        self.response_bytes: List[int] = []
+        self.request_seconds: List[float] = []
+
+    def request(self, *args, **kwargs):
+        start = time.perf_counter()
+        resp, content = self.http.request(*args, **kwargs)
+        self.request_seconds.append(time.perf_counter() - start)
+        self.response_bytes.append(len(content))
+        return resp, content
+
+def _decode_seconds(request, http: CountingHttp) -> float:
+    """Execute a request, re-decoding its raw body to time JSON parsing alone"""
+    raw = {}
+
+    def capture(resp, content):
+        raw['content'] = content
+        return content
+
+    request.postproc = capture
+    request.execute(http=http)
+    start = time.perf_counter()
+    json.loads(raw['content'])
+    return time.perf_counter() - start
+
+def benchmark_formats(extractor: GoogleDataExtractor, message_count: int) -> Dict[str, Any]:
+    """Compare bytes and decode time per message for full vs lean fetch modes"""
+    listing = extractor.gmail_service.users().messages().list(
+        userId='me',
+        maxResults=message_count,
+        labelIds=['INBOX']
+    ).execute()
+    message_ids = [m['id'] for m in listing.get('messages', [])]
+
+    report: Dict[str, Any] = {'messages': len(message_ids), 'gmail': {}, 'calendar': {}}
+
+    for mode in ('full', 'lean'):
+        extractor.lean = mode == 'lean'
+
+        http = CountingHttp(extractor.gmail_service._http)
+        decode_seconds = [
+            _decode_seconds(extractor._message_request(extractor.gmail_service, message_id), http)
+            for message_id in message_ids
+        ]
+        report['gmail'][mode] = {
+            'total_bytes': sum(http.response_bytes),
+            'bytes_per_message': statistics.mean(http.response_bytes) if message_ids else 0,
+            'request_ms_per_message': statistics.mean(http.request_seconds) * 1000 if message_ids else 0,
+            'decode_ms_per_message': statistics.mean(decode_seconds) * 1000 if message_ids else 0
+        }
+
+        http = CountingHttp(extractor.calendar_service._http)
+        request = extractor.calendar_service.events().list(
+            calendarId='primary',
+            maxResults=250,
+            singleEvents=True,
+            **extractor._fields(CALENDAR_EVENT_FIELDS)
+        )
+        decode = _decode_seconds(request, http)
+        report['calendar'][mode] = {
+            'total_bytes': sum(http.response_bytes),
+            'request_ms': http.request_seconds[0] * 1000,
+            'decode_ms': decode * 1000
+        }
+
+    extractor.lean = False
+    return report
+
+def print_formats_report(report: Dict[str, Any]) -> None:
+    """Print the full vs lean comparison as a table"""
+    print(f"\n📊 Gmail fetch formats ({report['messages']} messages)")
+    print(f"{'mode':6} {'bytes/msg':>12} {'total bytes':>14} {'request ms':>12} {'decode ms':>10}")
+    for mode, stats in report['gmail'].items():
+        print(f"{mode:6} {stats['bytes_per_message']:12.0f} {stats['total_bytes']:14d} "
+              f"{stats['request_ms_per_message']:12.1f} {stats['decode_ms_per_message']:10.3f}")
+
+    full = report['gmail']['full']['total_bytes']
+    lean = report['gmail']['lean']['total_bytes']
+    if lean:
+        print(f"→ lean mode transfers {full / lean:.1f}x fewer bytes")
+
+    print("\n📊 Calendar events.list")
+    print(f"{'mode':6} {'bytes':>12} {'request ms':>12} {'decode ms':>10}")
+    for mode, stats in report['calendar'].items():
+        print(f"{mode:6} {stats['total_bytes']:12d} {stats['request_ms']:12.1f} {stats['decode_ms']:10.3f}")
+
+def synthetic_messages(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Build message resources with realistic header counts and Date variants"""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        headers = [{'name': name, 'value': f'value-{i}'} for name in SAMPLE_FILLER_HEADERS]
+        headers += [
+            {'name': 'Subject', 'value': f'Tilbud på opgave #{i}'},
+            {'name': 'From', 'value': f'Kunde {i % 500} <kunde{i % 500}@example.dk>'},
+            {'name': 'Date', 'value': rng.choice(SAMPLE_DATE_HEADERS)},
+        ]
+        rng.shuffle(headers)
+        messages.append({
+            'id': f'msg{i}',
+            'threadId': f'thread{i // 3}',
+            'labelIds': ['INBOX'],
+            'snippet': 'Hej, jeg vil gerne have et tilbud ' * 4,
+            'payload': {'headers': headers}
+        })
+    return messages
+
+def load_corpus(filename: str) -> List[Dict[str, Any]]:
+    """Load captured Gmail message resources, one JSON object per line"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def legacy_normalize_email(message_id: str, msg_detail: Dict[str, Any]) -> Dict[str, Any]:
+    """The original per-header scan and strict strptime path, kept as a baseline"""
+    headers = msg_detail['payload'].get('headers', [])
+    subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
+    sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown')
+    date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
+    try:
+        iso_date = datetime.strptime(date, '%a, %d %b %Y %H:%M:%S %z').isoformat()
+    except ValueError:
+        iso_date = datetime.now().isoformat()
+    return {
+        'id': message_id,
+        'subject': subject,
+        'sender': sender,
+        'date': iso_date,
+        'snippet': msg_detail.get('snippet', '')[:200],
+        'thread_id': msg_detail.get('threadId', ''),
+        'labels': msg_detail.get('labelIds', [])
+    }
+
+def _strict_parse_fails(value: str) -> bool:
+    try:
+        datetime.strptime(value, '%a, %d %b %Y %H:%M:%S %z')
+        return False
+    except ValueError:
+        return True
+
+def benchmark_normalize(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Time legacy vs single-pass normalization, cold and with a warm date cache"""
+    report: Dict[str, Any] = {'messages': len(messages)}
+
+    def run(normalize) -> float:
+        start = time.perf_counter()
+        for message in messages:
+            normalize(message['id'], message)
+        return time.perf_counter() - start
+
+    report['legacy_seconds'] = run(legacy_normalize_email)
+    parse_email_date.cache_clear()
+    report['cold_cache_seconds'] = run(normalize_email)
+    report['warm_cache_seconds'] = run(normalize_email)
+    cache = parse_email_date.cache_info()
+    report['date_cache'] = {'hits': cache.hits, 'misses': cache.misses}
+
+    # How often each path lands on a usable, correct timestamp
+    legacy_fallbacks = sum(
+        1 for message in messages
+        if _strict_parse_fails(next((h['value'] for h in message['payload'].get('headers', [])
+                                     if h['name'].lower() == 'date'), ''))
+    )
+    report['legacy_fallback_to_now'] = legacy_fallbacks
+    report['unparseable_dates'] = sum(1 for message in messages if not normalize_email(message['id'], message)['date'])
+    return report
+
+def print_normalize_report(report: Dict[str, Any]) -> None:
+    """Print normalization timings per message"""
+    count = report['messages'] or 1
+    print(f"\n📊 Gmail normalization ({report['messages']} messages)")
+    print(f"{'path':12} {'total s':>10} {'µs/msg':>10}")
+    for label, key in (('legacy', 'legacy_seconds'), ('cold cache', 'cold_cache_seconds'),
+                       ('warm cache', 'warm_cache_seconds')):
+        print(f"{label:12} {report[key]:10.3f} {report[key] / count * 1e6:10.2f}")
+    print(f"→ date cache: {report['date_cache']['hits']} hits, {report['date_cache']['misses']} misses")
+    print(f"→ legacy path fell back to now() for {report['legacy_fallback_to_now']} messages; "
+          f"{report['unparseable_dates']} remain unparseable")
+
+def benchmark_startup(runs: int) -> Dict[str, Any]:
+    """Time cold (fresh interpreter) and warm (in-process) extractor startup"""
+    cold_runs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', COLD_START_PROGRAM.format(script_dir=SCRIPT_DIR)],
+            capture_output=True, text=True, check=False
+        )
+        wall = time.perf_counter() - start
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        if not timings.pop('ok'):
+            raise RuntimeError("Authentication failed; run extract_google_data.py --test first")
+        cold_runs.append({'wall': wall, **timings})
+
+    warm_runs = []
+    extractor = GoogleDataExtractor()
+    for _ in range(runs):
+        start = time.perf_counter()
+        if not extractor.authenticate():
+            raise RuntimeError("Authentication failed; run extract_google_data.py --test first")
+        warm_runs.append({'total': time.perf_counter() - start, **extractor.startup_timings})
+
+    def summarize(samples: List[Dict[str, float]]) -> Dict[str, float]:
+        phases = sorted({phase for sample in samples for phase in sample})
+        return {phase: statistics.median(sample.get(phase, 0.0) for sample in samples) for phase in phases}
+
+    return {'runs': runs, 'cold': summarize(cold_runs), 'warm': summarize(warm_runs)}
+
+def print_startup_report(report: Dict[str, Any]) -> None:
+    """Print median startup phase timings"""
+    print(f"\n📊 Extractor startup (median of {report['runs']} runs)")
+    for mode in ('cold', 'warm'):
+        phases = ', '.join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in report[mode].items())
+        print(f"{mode:5} {phases}")
+
+OFFLINE_STRATEGIES = ['serial', 'concurrent', 'batch', 'stream', 'incremental']
+# Token bucket rate that never blocks, so quota pacing doesn't mask client-side costs
+UNLIMITED_RATE = 1e9
+
+class CallRecorder:
+    """Thread-safe per-call latencies, keyed by API method"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[str, List[float]] = {}
+        self.statuses: Dict[int, int] = {}
+
+    def add(self, method: str, seconds: float, status: int) -> None:
+        with self.lock:
+            self.calls.setdefault(method, []).append(seconds)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                method: {
+                    'calls': len(seconds),
+                    'p50_ms': _percentile(seconds, 50) * 1000,
+                    'p95_ms': _percentile(seconds, 95) * 1000,
+                }
+                for method, seconds in sorted(self.calls.items())
+            }
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered))) - 1))]
+
+def _api_method(uri: str) -> str:
+    """API method name for a request URI, e.g. messages.get"""
+    parts = [part for part in urlsplit(uri).path.split('/') if part]
+    if parts and parts[0] == 'batch':
+        return 'batch'
+    if parts[-1:] == ['events']:
+        return 'events.list'
+    if 'messages' in parts:
+        return 'messages.list' if parts[-1] == 'messages' else 'messages.get'
+    if parts[-1:] == ['history']:
+        return 'history.list'
+    return parts[-1] if parts else 'unknown'
+
+class TimedHttp:
+    """httplib2-compatible wrapper that records each call's latency in a CallRecorder"""
+
+    def __init__(self, http, recorder: CallRecorder):
+        self.http = http
+        self.recorder = recorder
+
+    def request(self, uri, *args, **kwargs):
+        start = time.perf_counter()
+        resp, content = self.http.request(uri, *args, **kwargs)
+        self.recorder.add(_api_method(uri), time.perf_counter() - start, resp.status)
+        return resp, content
+
+    def __getattr__(self, name):
+        # googleapiclient reads attributes such as timeout from the wrapped Http
+        return getattr(self.http, name)
+
+class FakeApiServer:
+    """fake_google_api.py running in a subprocess, so its work isn't in our measurements"""
+
+    def __init__(self, options: List[str]):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(SCRIPT_DIR, 'fake_google_api.py'), '--port', '0', *options],
+            stdout=subprocess.PIPE, text=True
+        )
+        port = json.loads(self.process.stdout.readline())['port']
+        self.url = f'http://127.0.0.1:{port}/'
+        self.http = httplib2.Http()
+
+    def stats(self) -> Dict[str, int]:
+        _, content = self.http.request(self.url + '_stats')
+        return json.loads(content)
+
+    def reset(self) -> None:
+        self.http.request(self.url + '_reset', method='POST')
+
+    def close(self) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+def offline_extractor(url: str, recorder: CallRecorder, workers: int = 1, lean: bool = False,
+                      quota: bool = False) -> GoogleDataExtractor:
+    """An extractor whose services talk to the fake API server without credentials"""
+    extractor = GoogleDataExtractor(workers=workers, lean=lean)
+
+    def build_service(api: str):
+        document = dict(load_discovery_document(api, API_VERSIONS[api]))
+        document['rootUrl'] = document['mtlsRootUrl'] = url
+        return build_from_document(document, http=TimedHttp(httplib2.Http(), recorder))
+
+    # Per-thread services in concurrent mode are built through the same hook
+    extractor._build_service = build_service
+    extractor.gmail_service = build_service('gmail')
+    extractor.calendar_service = build_service('calendar')
+    if not quota:
+        extractor.gmail_limiter = TokenBucket(UNLIMITED_RATE)
+        extractor.calendar_limiter = TokenBucket(UNLIMITED_RATE)
+    return extractor
+
+def _measure(run, trace_memory: bool) -> Dict[str, Any]:
+    """Time a callable, with its peak traced Python heap"""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return {'result': result, 'seconds': seconds, 'peak_heap_mb': peak}
+
+def benchmark_offline(args) -> Dict[str, Any]:
+    """Run extract_all_data, streaming, incremental sync and the save paths against the fake API"""
+    server = FakeApiServer([
+        '--messages', str(args.messages),
+        '--events', str(args.events),
+        '--payload-bytes', str(args.payload_bytes),
+        '--history-changes', str(args.history_changes),
+        '--latency-ms', str(args.latency_ms),
+        '--error-rate', str(args.error_rate),
+    ])
+    report: Dict[str, Any] = {
+        'messages': args.messages,
+        'events': args.events,
+        'payload_bytes': args.payload_bytes,
+        'latency_ms': args.latency_ms,
+        'error_rate': args.error_rate,
+        'lean': args.lean,
+        'strategies': {},
+        'save': {},
+    }
+    data: Optional[Dict[str, Any]] = None
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for strategy in args.strategies:
+                recorder = CallRecorder()
+                workers = args.workers if strategy == 'concurrent' else 1
+                extractor = offline_extractor(server.url, recorder, workers, args.lean, args.quota)
+                server.reset()
+                print(f"⏱️  {strategy}...")
+
+                if strategy == 'stream':
+                    output = os.path.join(workdir, 'stream.jsonl')
+                    measured = _measure(lambda: extractor.save_to_jsonl(
+                        output,
+                        extractor.iter_emails(batch=args.stream_batch),
+                        extractor.iter_calendar_events(days_ahead=3650),
+                    ), args.trace_memory)
+                    emails, events = args.messages, args.events
+                elif strategy == 'incremental':
+                    state_file = os.path.join(workdir, 'sync_state.json')
+                    extractor.save_sync_state({'gmail_history_id': '1', 'calendar_sync_token': 'sync-token'},
+                                              state_file)
+                    measured = _measure(lambda: extractor.extract_incremental(
+                        state_file, batch=args.stream_batch, max_emails=None
+                    ), args.trace_memory)
+                    emails = len(measured['result']['emails'])
+                    events = len(measured['result']['calendar_events'])
+                else:
+                    measured = _measure(lambda: extractor.extract_all_data(
+                        batch=strategy == 'batch', max_emails=None, max_events=None
+                    ), args.trace_memory)
+                    emails = len(measured['result']['emails'])
+                    events = len(measured['result']['calendar_events'])
+                    data = data or measured['result']
+
+                seconds = measured['seconds']
+                report['strategies'][strategy] = {
+                    'seconds': seconds,
+                    'emails': emails,
+                    'events': events,
+                    'emails_per_second': emails / seconds if seconds else 0.0,
+                    'peak_heap_mb': measured['peak_heap_mb'],
+                    'calls': recorder.summary(),
+                    'http_statuses': recorder.statuses,
+                    'server_calls': server.stats(),
+                }
+
+            if data is not None:
+                for name, save in (
+                    ('json', lambda path: extractor.save_to_json(data, path)),
+                    ('jsonl', lambda path: extractor.save_to_jsonl(
+                        path, data['emails'], data['calendar_events'], data['metadata'])),
+                    ('jsonl.gz', lambda path: extractor.save_to_jsonl(
+                        path, data['emails'], data['calendar_events'], data['metadata'], compression='gzip')),
+                    ('md', lambda path: extractor.save_to_markdown(data, path)),
+                ):
+                    path = os.path.join(workdir, f'extract.{name}')
+                    measured = _measure(lambda: save(path), args.trace_memory)
+                    report['save'][name] = {
+                        'seconds': measured['seconds'],
+                        'bytes': os.path.getsize(path),
+                        'peak_heap_mb': measured['peak_heap_mb'],
+                    }
+    finally:
+        server.close()
+
+    report['peak_rss_mb'] = _peak_rss_mb()
+    return report
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def print_offline_report(report: Dict[str, Any]) -> None:
+    """Print throughput, memory and per-call latency for each strategy, then the save paths"""
+    print(f"\n📊 Offline extractor ({report['messages']} messages, {report['events']} events, "
+          f"{report['payload_bytes']} B payloads, {report['latency_ms']:g} ms latency, "
+          f"{report['error_rate']:.1%} 429s{', lean' if report['lean'] else ''})")
+    print(f"{'strategy':12} {'seconds':>9} {'emails/s':>10} {'emails':>8} {'events':>8} {'peak heap':>10} {'429s':>6}")
+    for strategy, stats in report['strategies'].items():
+        heap = f"{stats['peak_heap_mb']:.1f} MB" if stats['peak_heap_mb'] is not None else 'n/a'
+        print(f"{strategy:12} {stats['seconds']:9.2f} {stats['emails_per_second']:10.1f} {stats['emails']:8d} "
+              f"{stats['events']:8d} {heap:>10} {stats['server_calls'].get('throttled', 0):6d}")
+
+    print(f"\n{'strategy':12} {'method':14} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for strategy, stats in report['strategies'].items():
+        for method, call in stats['calls'].items():
+            print(f"{strategy:12} {method:14} {call['calls']:7d} {call['p50_ms']:8.1f} {call['p95_ms']:8.1f}")
+    for strategy, stats in report['strategies'].items():
+        server_calls = ', '.join(f"{method} {count}" for method, count in sorted(stats['server_calls'].items()))
+        print(f"→ {strategy}: API calls served: {server_calls}")
+
+    if report['save']:
+        print(f"\n{'save':10} {'seconds':>9} {'bytes':>12} {'peak heap':>10}")
+        for name, stats in report['save'].items():
+            heap = f"{stats['peak_heap_mb']:.1f} MB" if stats['peak_heap_mb'] is not None else 'n/a'
+            print(f"{name:10} {stats['seconds']:9.3f} {stats['bytes']:12d} {heap:>10}")
+    if report['peak_rss_mb'] is not None:
+        print(f"→ process peak RSS: {report['peak_rss_mb']:.0f} MB")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark the Google data extractor')
+    parser.add_argument('--json', dest='json_output', default=None,
+                       help='Also write the raw report to this JSON file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    formats_parser = subparsers.add_parser('formats', help='Compare full vs lean fetch payload sizes (live account)')
+    formats_parser.add_argument('--messages', type=int, default=50,
+                               help='Number of INBOX messages to sample')
+
+    normalize_parser = subparsers.add_parser('normalize', help='Micro-benchmark header and date normalization')
+    normalize_parser.add_argument('--messages', type=int, default=100000,
+                                 help='Number of synthetic messages when no corpus is given')
+    normalize_parser.add_argument('--corpus', default=None,
+                                 help='JSON Lines file of captured Gmail message resources')
+
+    startup_parser = subparsers.add_parser('startup', help='Time cold and warm startup (needs token.json)')
+    startup_parser.add_argument('--runs', type=int, default=5)
+
+    offline_parser = subparsers.add_parser('offline', help='Benchmark fetch strategies and save paths against a fake API')
+    offline_parser.add_argument('--messages', type=int, default=2000, help='Synthetic INBOX size')
+    offline_parser.add_argument('--events', type=int, default=500, help='Synthetic calendar events')
+    offline_parser.add_argument('--payload-bytes', type=int, default=2000, help='Message body size in full format')
+    offline_parser.add_argument('--history-changes', type=int, default=100,
+                               help='Changes returned to the incremental sync')
+    offline_parser.add_argument('--latency-ms', type=float, default=20.0, help='Latency added to every HTTP request')
+    offline_parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API calls answered with 429')
+    offline_parser.add_argument('--strategies', nargs='+', default=OFFLINE_STRATEGIES, choices=OFFLINE_STRATEGIES)
+    offline_parser.add_argument('--workers', type=int, default=8, help='Threads for the concurrent strategy')
+    offline_parser.add_argument('--stream-batch', action='store_true',
+                               help='Use batch requests for the stream and incremental strategies')
+    offline_parser.add_argument('--lean', action='store_true', help='Metadata format and fields masks')
+    offline_parser.add_argument('--quota', action='store_true',
+                               help='Keep the real per-user quota pacing (off by default)')
+    offline_parser.add_argument('--no-trace-memory', dest='trace_memory', action='store_false',
+                               help='Skip tracemalloc, which slows Python-heavy paths')
+
+    args = parser.parse_args()
+
+    if args.command == 'startup':
+        report = benchmark_startup(args.runs)
+        print_startup_report(report)
+
+    if args.command == 'normalize':
+        messages = load_corpus(args.corpus) if args.corpus else synthetic_messages(args.messages)
+        report = benchmark_normalize(messages)
+        print_normalize_report(report)
+
+    if args.command == 'offline':
+        report = benchmark_offline(args)
+        print_offline_report(report)
+
+    if args.command == 'formats':
+        extractor = GoogleDataExtractor()
+        if not extractor.authenticate():
+            print("❌ Failed to authenticate. Exiting.")
+            sys.exit(1)
+        report = benchmark_formats(extractor, args.messages)
+        print_formats_report(report)
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📁 Report saved to: {args.json_output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Logo Generator Benchmarks
+
+Runs generate_logo.py under different performance settings, each in a fresh
+process, and reports load time, seconds per image and peak RSS.
+Usage: python benchmark_logo.py [--settings fp32 bf16 cpu-optimize] [--images 3] [--threads 16]
+
+Each run generates --images images one per pipeline call; the first call
+includes warm-up (and compilation with --compile), so steady-state seconds
+per image are taken from the later calls. Images are written to a temporary
+directory and discarded. The embedding/image cache is disabled so every
+setting does the same work.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any
+
+from generate_logo import DEFAULT_BASE_DIR, DEFAULT_FUSED_DIR, DEFAULT_LORA_PATH
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generate_logo.py')
+
+SETTINGS: Dict[str, List[str]] = {
+    'fp32': ['--dtype', 'float32'],
+    'bf16': ['--dtype', 'bfloat16'],
+    'bf16-channels-last': ['--dtype', 'bfloat16', '--channels-last'],
+    'bf16-compile': ['--dtype', 'bfloat16', '--channels-last', '--compile'],
+    'bf16-sliced-tiled': ['--dtype', 'bfloat16', '--attention-slicing', '--vae-tiling'],
+    'bf16-low-memory': ['--dtype', 'bfloat16', '--low-memory'],
+    'cpu-optimize': ['--cpu-optimize'],
+}
+
+def run_setting(name: str, flags: List[str], args) -> Dict[str, Any]:
+    """Generate args.images images with one setting in a fresh process and return its report"""
+    with tempfile.TemporaryDirectory() as workdir:
+        report_path = os.path.join(workdir, 'report.json')
+        command = [
+            sys.executable, SCRIPT,
+            '--company', 'Benchmark',
+            '--device', args.device,
+            '--seed', '0',
+            '--num-images', str(args.images),
+            '--max-batch', '1',
+            '--steps', str(args.steps),
+            '--height', str(args.height),
+            '--width', str(args.width),
+            '--base_dir', str(Path(args.base_dir).resolve()),
+            '--lora_path', str(Path(args.lora_path).resolve()),
+            '--output', f'benchmark-{name}',
+            '--report', report_path,
+            # Cached prompt embeddings from an earlier setting would skip its text encoding
+            '--no-cache',
+            *flags,
+        ]
+        if args.threads:
+            command += ['--threads', str(args.threads)]
+        fused_dir = args.fused_dir or (DEFAULT_FUSED_DIR if '--cpu-optimize' in flags else None)
+        if fused_dir:
+            command += ['--fused_dir', str(Path(fused_dir).resolve())]
+
+        # Relative output paths land in the temporary working directory
+        result = subprocess.run(command, cwd=workdir, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            return {'setting': name, 'ok': False, 'exit_code': result.returncode,
+                    'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''}
+        with open(report_path, 'r', encoding='utf-8') as f:
+            return {'setting': name, 'ok': True, **json.load(f)}
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """Print one row per setting"""
+    print(f"\n📊 Logo generation ({results[0].get('images', '?') if results else 0} images per setting)")
+    print(f"{'setting':20} {'load':>8} {'first':>9} {'s/image':>9} {'peak RSS':>10}")
+    for result in results:
+        if not result['ok']:
+            print(f"{result['setting']:20} failed (exit {result['exit_code']}): {result['error']}")
+            continue
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result.get('peak_rss_mb') is not None else 'n/a'
+        print(
+            f"{result['setting']:20} {result['timings']['load']:7.1f}s "
+            f"{result['first_call_seconds_per_image']:8.1f}s {result['seconds_per_image']:8.1f}s {rss:>10}"
+        )
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark logo generation settings')
+    parser.add_argument('--settings', nargs='+', default=list(SETTINGS), choices=list(SETTINGS))
+    parser.add_argument('--images', type=int, default=3, help='Images per setting (first one is warm-up)')
+    parser.add_argument('--steps', type=int, default=4)
+    parser.add_argument('--height', type=int, default=1024)
+    parser.add_argument('--width', type=int, default=1024)
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--base_dir', default=DEFAULT_BASE_DIR)
+    parser.add_argument('--lora_path', default=DEFAULT_LORA_PATH)
+    parser.add_argument('--fused_dir', default=None,
+                       help='Fused model directory for all settings (cpu-optimize uses its default otherwise)')
+    parser.add_argument('--json', dest='json_output', default=None,
+                       help='Also write the raw report to this JSON file')
+
+    args = parser.parse_args()
+
+    results = []
+    for name in args.settings:
+        print(f"⏱️  {name}...")
+        results.append(run_setting(name, SETTINGS[name], args))
+    print_report(results)
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📁 Report saved to: {args.json_output}")
+
+if __name__ == '__main__':
+    main()
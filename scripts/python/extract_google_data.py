@@ -2,24 +2,34 @@
 """
 Google Data Extractor
 
-This script fetches data from Gmail and Google Calendar APIs and saves it to JSON or Markdown format.
-Usage: python extract_google_data.py --output-format json|md
+This script fetches data from Gmail and Google Calendar APIs and saves it to JSON, JSON Lines or Markdown format.
+Usage: python extract_google_data.py --output-format json|jsonl|md [--batch] [--incremental]
 """
 
 import argparse
+import gzip
+import io
 import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 import sys
 
-# Google API imports
-from google.auth.transport.requests import Request
+# Google API imports (google.auth.transport.requests and google_auth_oauthlib are
+# imported lazily in authenticate; they are only needed to refresh or log in)
+import httplib2
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import DISCOVERY_URI, build_from_document
 from googleapiclient.errors import HttpError
 
+from google_data_store import GoogleDataStore
+from gmail_normalize import normalize_email
+
 # Constants
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -27,42 +37,191 @@ SCOPES = [
 ]
 TOKEN_FILE = 'token.json'
 CREDENTIALS_FILE = 'credentials.json'
+# Refresh access tokens this long before they expire, so a run never starts
+# with a token that lapses mid-extraction
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+# Discovery documents not bundled with googleapiclient are fetched once and kept here
+DISCOVERY_CACHE_DIR = '.discovery_cache'
+
+# Gmail batch requests accept at most 100 calls, but Google recommends <= 50
+# per batch to stay clear of per-user concurrency limits.
+GMAIL_BATCH_SIZE = 50
+MAX_RETRIES = 5
+# Maximum page sizes accepted by messages.list and events.list
+GMAIL_PAGE_SIZE = 500
+CALENDAR_PAGE_SIZE = 250
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 32
+
+API_VERSIONS = {'gmail': 'v1', 'calendar': 'v3'}
+# Gmail allows 250 quota units per user per second; calls are priced per method
+GMAIL_QUOTA_UNITS_PER_SECOND = 250
+GMAIL_QUOTA_COSTS = {'messages.list': 5, 'messages.get': 5, 'history.list': 2, 'getProfile': 1}
+# Calendar quotas are per request; stay well under the per-user per-minute limit
+CALENDAR_REQUESTS_PER_SECOND = 10
+
+# Lean fetch mode: metadata-only message format plus partial-response masks
+# limited to the fields the normalizers actually read
+GMAIL_METADATA_HEADERS = ['Subject', 'From', 'Date']
+GMAIL_MESSAGE_FIELDS = 'id,threadId,labelIds,snippet,internalDate,payload/headers'
+GMAIL_LIST_FIELDS = 'messages/id,nextPageToken'
+GMAIL_HISTORY_FIELDS = (
+    'history(messagesAdded/message(id,labelIds),messagesDeleted/message/id,'
+    'labelsAdded/message(id,labelIds),labelsRemoved(message/id,labelIds)),historyId,nextPageToken'
+)
+CALENDAR_EVENT_FIELDS = (
+    'items(id,summary,description,start,end,location,attendees(email,displayName,responseStatus),'
+    'creator/email,status),nextPageToken,nextSyncToken'
+)
+
+# Required fields per output record
+EMAIL_REQUIRED_FIELDS = ['id', 'subject', 'sender', 'date', 'snippet']
+EVENT_REQUIRED_FIELDS = ['id', 'summary', 'start', 'end']
+
+# JSON Lines output compression
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# Incremental sync checkpoints (Gmail historyId / Calendar syncToken)
+SYNC_STATE_FILE = 'google_sync_state.json'
+# Gmail answers an expired startHistoryId with 404, Calendar an expired syncToken with 410
+SYNC_EXPIRED_STATUS_CODES = {404, 410}
+
+# Parsed discovery documents, shared by every service built in this process
+_discovery_documents: Dict[str, Dict[str, Any]] = {}
+
+def load_discovery_document(api: str, version: str) -> Dict[str, Any]:
+    """Load a discovery document without a network round trip when possible
+    
+    Uses the copy bundled with googleapiclient, then the local
+    DISCOVERY_CACHE_DIR, and only then fetches it from Google and caches it.
+    """
+    key = f"{api}.{version}"
+    if key not in _discovery_documents:
+        content = discovery_cache.get_static_doc(api, version)
+        if content is None:
+            cache_file = os.path.join(DISCOVERY_CACHE_DIR, f"{key}.json")
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            else:
+                resp, body = httplib2.Http().request(DISCOVERY_URI.format(api=api, apiVersion=version))
+                if resp.status >= 400:
+                    raise RuntimeError(f"Could not fetch discovery document for {key}: HTTP {resp.status}")
+                content = body.decode('utf-8')
+                os.makedirs(DISCOVERY_CACHE_DIR, exist_ok=True)
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+        _discovery_documents[key] = json.loads(content)
+    return _discovery_documents[key]
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether an API error is a transient rate-limit/server error"""
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status in RETRYABLE_STATUS_CODES:
+        return True
+    # Gmail reports per-user rate limits as 403 with a rateLimitExceeded reason
+    return error.resp.status == 403 and 'ratelimitexceeded' in str(error).lower()
+
+def _is_sync_expired(error: Exception) -> bool:
+    """Check whether an API error means the stored sync checkpoint is no longer valid"""
+    return isinstance(error, HttpError) and error.resp.status in SYNC_EXPIRED_STATUS_CODES
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace API calls within per-user quotas"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1) -> None:
+        """Block until the requested number of tokens is available
+        
+        Requests larger than the capacity wait for a full bucket and leave it
+        in debt, so later calls wait off the excess and the average rate holds.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= min(tokens, self.capacity):
+                    self.tokens -= tokens
+                    return
+                wait = (min(tokens, self.capacity) - self.tokens) / self.rate
+            time.sleep(wait)
 
 class GoogleDataExtractor:
     """Main class for extracting data from Google APIs"""
     
-    def __init__(self):
+    def __init__(self, workers: int = 1, lean: bool = False):
         self.creds = None
         self.gmail_service = None
         self.calendar_service = None
+        self.pending_sync_state = None
+        # Concurrent mode: workers > 1 fans message fetches out over a thread pool
+        self.workers = max(1, workers)
+        # Lean mode: format=metadata and fields= masks instead of full payloads
+        self.lean = lean
+        self.gmail_limiter = TokenBucket(GMAIL_QUOTA_UNITS_PER_SECOND)
+        self.calendar_limiter = TokenBucket(CALENDAR_REQUESTS_PER_SECOND)
+        self._local = threading.local()
+        self.startup_timings: Dict[str, float] = {}
         
     def authenticate(self) -> bool:
-        """Authenticate with Google APIs using OAuth 2.0"""
+        """Authenticate with Google APIs using OAuth 2.0
+        
+        Tokens are refreshed TOKEN_REFRESH_MARGIN before they expire, token.json
+        is only rewritten when its contents changed, and services are built from
+        discovery documents cached in-process. Per-phase timings are recorded in
+        self.startup_timings.
+        """
         try:
+            timings = self.startup_timings = {}
+            phase_start = time.perf_counter()
+            token_json = None
+            
             # Load existing token if available
             if os.path.exists(TOKEN_FILE):
-                self.creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+                with open(TOKEN_FILE, 'r', encoding='utf-8') as f:
+                    token_json = f.read()
+                self.creds = Credentials.from_authorized_user_info(json.loads(token_json), SCOPES)
+            timings['load_token'] = time.perf_counter() - phase_start
             
             # If there are no (valid) credentials available, let the user log in.
-            if not self.creds or not self.creds.valid:
-                if self.creds and self.creds.expired and self.creds.refresh_token:
+            if not self.creds or not self.creds.valid or self._token_expires_soon():
+                phase_start = time.perf_counter()
+                if self.creds and self.creds.refresh_token:
+                    # Deferred: google.auth.transport.requests costs ~0.2s to import
+                    from google.auth.transport.requests import Request
                     self.creds.refresh(Request())
                 else:
                     if not os.path.exists(CREDENTIALS_FILE):
                         print(f"Error: {CREDENTIALS_FILE} not found. Please download it from Google Cloud Console.")
                         return False
                     
+                    from google_auth_oauthlib.flow import InstalledAppFlow
                     flow = InstalledAppFlow.from_client_secrets_file(
                         CREDENTIALS_FILE, SCOPES)
                     self.creds = flow.run_local_server(port=0)
+                timings['refresh'] = time.perf_counter() - phase_start
                 
-                # Save the credentials for the next run
-                with open(TOKEN_FILE, 'w') as token:
-                    token.write(self.creds.to_json())
+                # Save the credentials for the next run, unless nothing changed
+                new_token_json = self.creds.to_json()
+                if new_token_json != token_json:
+                    tmp_filename = f"{TOKEN_FILE}.tmp"
+                    with open(tmp_filename, 'w') as token:
+                        token.write(new_token_json)
+                    os.replace(tmp_filename, TOKEN_FILE)
             
             # Build services
-            self.gmail_service = build('gmail', 'v1', credentials=self.creds)
-            self.calendar_service = build('calendar', 'v3', credentials=self.creds)
+            phase_start = time.perf_counter()
+            self.gmail_service = self._build_service('gmail')
+            self.calendar_service = self._build_service('calendar')
+            timings['build_services'] = time.perf_counter() - phase_start
             
             print("✅ Authentication successful")
             return True
@@ -71,57 +230,190 @@ class GoogleDataExtractor:
             print(f"❌ Authentication failed: {str(e)}")
             return False
     
-    def fetch_gmail_data(self, max_results: int = 50) -> List[Dict[str, Any]]:
-        """Fetch recent emails from Gmail"""
-        try:
-            print(f"📧 Fetching {max_results} recent emails...")
-            
-            # Get messages list
-            results = self.gmail_service.users().messages().list(
+    def _token_expires_soon(self) -> bool:
+        """Check whether the access token expires within TOKEN_REFRESH_MARGIN"""
+        expiry = getattr(self.creds, 'expiry', None)
+        if not expiry or not self.creds.refresh_token:
+            return False
+        # google.auth keeps expiry as a naive UTC datetime
+        return expiry - datetime.utcnow() < TOKEN_REFRESH_MARGIN
+    
+    def _build_service(self, api: str):
+        """Build an API service object from the shared credentials"""
+        return build_from_document(
+            load_discovery_document(api, API_VERSIONS[api]),
+            credentials=self.creds
+        )
+    
+    def _worker_service(self, api: str):
+        """Return a per-thread service object
+        
+        Service objects wrap a single httplib2.Http, which is not thread-safe,
+        so each worker thread lazily builds its own from self.creds.
+        """
+        service = getattr(self._local, api, None)
+        if service is None:
+            service = self._build_service(api)
+            setattr(self._local, api, service)
+        return service
+    
+    def _execute(self, request, limiter: TokenBucket, cost: float = 1):
+        """Execute an API request under a rate limiter, backing off on 429/5xx"""
+        for attempt in range(MAX_RETRIES + 1):
+            limiter.acquire(cost)
+            try:
+                return request.execute()
+            except HttpError as error:
+                if not _is_retryable(error) or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(min(2 ** attempt + random.random(), MAX_BACKOFF_SECONDS))
+    
+    def _fields(self, mask: str) -> Dict[str, str]:
+        """Partial-response parameters for an API call in lean mode"""
+        return {'fields': mask} if self.lean else {}
+    
+    def _message_request(self, service, message_id: str):
+        """Build a messages.get request, metadata-only in lean mode"""
+        if self.lean:
+            return service.users().messages().get(
                 userId='me',
-                maxResults=max_results,
-                labelIds=['INBOX']
-            ).execute()
+                id=message_id,
+                format='metadata',
+                metadataHeaders=GMAIL_METADATA_HEADERS,
+                fields=GMAIL_MESSAGE_FIELDS
+            )
+        return service.users().messages().get(userId='me', id=message_id)
+    
+    def _get_message(self, message_id: str) -> Dict[str, Any]:
+        """Fetch a single message, using a per-thread service in concurrent mode"""
+        service = self._worker_service('gmail') if self.workers > 1 else self.gmail_service
+        return self._execute(
+            self._message_request(service, message_id),
+            self.gmail_limiter,
+            GMAIL_QUOTA_COSTS['messages.get']
+        )
+    
+    def _normalize_email(self, message_id: str, msg_detail: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Gmail message resource into an output email record"""
+        return normalize_email(message_id, msg_detail)
+    
+    def _batch_get_messages(self, message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch message details using Gmail batch HTTP requests
+        
+        Items that fail with a retryable status (429/5xx) are re-queued and
+        retried with exponential backoff; other per-item errors are skipped.
+        A retryable failure of the batch request itself is retried like any
+        other call.
+        """
+        details: Dict[str, Dict[str, Any]] = {}
+        pending = list(message_ids)
+        attempt = 0
+        
+        while pending:
+            retry: List[str] = []
             
-            messages = results.get('messages', [])
-            email_data = []
+            def callback(request_id, response, exception):
+                if exception is None:
+                    details[request_id] = response
+                elif _is_retryable(exception):
+                    retry.append(request_id)
+                else:
+                    print(f"⚠️  Skipping message {request_id}: {exception}")
+            
+            for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+                chunk = pending[start:start + GMAIL_BATCH_SIZE]
+                batch = self.gmail_service.new_batch_http_request(callback=callback)
+                for message_id in chunk:
+                    batch.add(
+                        self._message_request(self.gmail_service, message_id),
+                        request_id=message_id
+                    )
+                # Each call inside a batch is charged individually against the quota
+                self._execute(batch, self.gmail_limiter, GMAIL_QUOTA_COSTS['messages.get'] * len(chunk))
+            
+            if not retry:
+                break
+            
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                print(f"⚠️  Giving up on {len(retry)} messages after {MAX_RETRIES} retries")
+                break
             
-            for message in messages:
-                # Get full message details
-                msg_detail = self.gmail_service.users().messages().get(
+            delay = 2 ** (attempt - 1)
+            print(f"⏳ Retrying {len(retry)} rate-limited messages in {delay}s...")
+            time.sleep(delay)
+            # Preserve the original ordering for the retried subset
+            retry_set = set(retry)
+            pending = [m for m in pending if m in retry_set]
+        
+        return details
+    
+    def iter_emails(self, max_results: Optional[int] = None, batch: bool = False,
+                    page_size: int = GMAIL_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Yield normalized INBOX emails, following nextPageToken across all pages
+        
+        Stops after max_results messages when given. With batch=True, each page's
+        message details are fetched in Gmail batch requests of up to
+        GMAIL_BATCH_SIZE calls instead of one round trip per message; otherwise,
+        with workers > 1 they are fetched concurrently over a thread pool.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 and not batch else None
+        try:
+            yield from self._iter_email_pages(max_results, batch, page_size, executor)
+        finally:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _iter_email_pages(self, max_results: Optional[int], batch: bool, page_size: int,
+                          executor: Optional[ThreadPoolExecutor]) -> Iterator[Dict[str, Any]]:
+        """Page through messages.list and yield normalized emails for iter_emails"""
+        page_token = None
+        remaining = max_results
+        
+        while remaining is None or remaining > 0:
+            # Get one page of the messages list
+            results = self._execute(
+                self.gmail_service.users().messages().list(
                     userId='me',
-                    id=message['id']
-                ).execute()
-                
-                # Extract headers
-                headers = msg_detail['payload'].get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), 'No Subject')
-                sender = next((h['value'] for h in headers if h['name'].lower() == 'from'), 'Unknown')
-                date = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
-                
-                # Parse date to ISO format
-                try:
-                    if date:
-                        # Parse email date format
-                        parsed_date = datetime.strptime(date, '%a, %d %b %Y %H:%M:%S %z')
-                        iso_date = parsed_date.isoformat()
-                    else:
-                        iso_date = datetime.now().isoformat()
-                except:
-                    iso_date = datetime.now().isoformat()
-                
-                # Extract snippet
-                snippet = msg_detail.get('snippet', '')[:200]  # Limit snippet length
-                
-                email_data.append({
-                    'id': message['id'],
-                    'subject': subject,
-                    'sender': sender,
-                    'date': iso_date,
-                    'snippet': snippet,
-                    'thread_id': msg_detail.get('threadId', ''),
-                    'labels': msg_detail.get('labelIds', [])
-                })
+                    maxResults=page_size if remaining is None else min(page_size, remaining),
+                    labelIds=['INBOX'],
+                    pageToken=page_token,
+                    **self._fields(GMAIL_LIST_FIELDS)
+                ),
+                self.gmail_limiter,
+                GMAIL_QUOTA_COSTS['messages.list']
+            )
+            
+            messages = results.get('messages', [])
+            if remaining is not None:
+                messages = messages[:remaining]
+                remaining -= len(messages)
+            
+            if batch:
+                details = self._batch_get_messages([m['id'] for m in messages])
+                for message in messages:
+                    if message['id'] in details:
+                        yield self._normalize_email(message['id'], details[message['id']])
+            elif executor:
+                # map() preserves input order, so output matches the serial path
+                details = executor.map(self._get_message, [m['id'] for m in messages])
+                for message, msg_detail in zip(messages, details):
+                    yield self._normalize_email(message['id'], msg_detail)
+            else:
+                for message in messages:
+                    # Get full message details
+                    yield self._normalize_email(message['id'], self._get_message(message['id']))
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def fetch_gmail_data(self, max_results: Optional[int] = 50, batch: bool = False) -> List[Dict[str, Any]]:
+        """Fetch recent emails from Gmail (max_results=None fetches the whole INBOX)"""
+        try:
+            print(f"📧 Fetching {max_results or 'all'} recent emails...")
+            
+            email_data = list(self.iter_emails(max_results=max_results, batch=batch))
             
             print(f"✅ Fetched {len(email_data)} emails")
             return email_data
@@ -133,69 +425,93 @@ class GoogleDataExtractor:
             print(f"❌ Error fetching Gmail data: {str(e)}")
             return []
     
-    def fetch_calendar_data(self, days_ahead: int = 7) -> List[Dict[str, Any]]:
-        """Fetch upcoming calendar events"""
+    def _normalize_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Calendar event resource into an output event record"""
+        # Extract start and end times
+        start = event['start'].get('dateTime', event['start'].get('date'))
+        end = event['end'].get('dateTime', event['end'].get('date'))
+        
+        # Convert to ISO format
         try:
-            print(f"📅 Fetching calendar events for next {days_ahead} days...")
+            if 'T' in start:  # datetime format
+                start_iso = datetime.fromisoformat(start.replace('Z', '+00:00')).isoformat()
+            else:  # date format
+                start_iso = datetime.fromisoformat(start).isoformat()
             
-            # Calculate time range
-            now = datetime.utcnow()
-            time_min = now.isoformat() + 'Z'
-            time_max = (now + timedelta(days=days_ahead)).isoformat() + 'Z'
-            
-            # Get events
-            events_result = self.calendar_service.events().list(
-                calendarId='primary',
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=50,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            if 'T' in end:
+                end_iso = datetime.fromisoformat(end.replace('Z', '+00:00')).isoformat()
+            else:
+                end_iso = datetime.fromisoformat(end).isoformat()
+        except:
+            start_iso = start
+            end_iso = end
+        
+        # Extract attendees
+        attendees = []
+        for attendee in event.get('attendees', []):
+            attendees.append({
+                'email': attendee.get('email', ''),
+                'display_name': attendee.get('displayName', ''),
+                'response_status': attendee.get('responseStatus', 'needsAction')
+            })
+        
+        return {
+            'id': event['id'],
+            'summary': event.get('summary', 'No Title'),
+            'description': event.get('description', ''),
+            'start': start_iso,
+            'end': end_iso,
+            'location': event.get('location', ''),
+            'attendees': attendees,
+            'creator': event.get('creator', {}).get('email', ''),
+            'status': event.get('status', 'confirmed')
+        }
+    
+    def iter_calendar_events(self, days_ahead: int = 7, max_results: Optional[int] = None,
+                             page_size: int = CALENDAR_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Yield normalized upcoming events, following nextPageToken across all pages"""
+        # Calculate time range
+        now = datetime.utcnow()
+        time_min = now.isoformat() + 'Z'
+        time_max = (now + timedelta(days=days_ahead)).isoformat() + 'Z'
+        
+        page_token = None
+        remaining = max_results
+        
+        while remaining is None or remaining > 0:
+            # Get one page of events
+            events_result = self._execute(
+                self.calendar_service.events().list(
+                    calendarId='primary',
+                    timeMin=time_min,
+                    timeMax=time_max,
+                    maxResults=page_size if remaining is None else min(page_size, remaining),
+                    singleEvents=True,
+                    orderBy='startTime',
+                    pageToken=page_token,
+                    **self._fields(CALENDAR_EVENT_FIELDS)
+                ),
+                self.calendar_limiter
+            )
             
             events = events_result.get('items', [])
-            calendar_data = []
+            if remaining is not None:
+                events = events[:remaining]
+                remaining -= len(events)
             
             for event in events:
-                # Extract start and end times
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                end = event['end'].get('dateTime', event['end'].get('date'))
-                
-                # Convert to ISO format
-                try:
-                    if 'T' in start:  # datetime format
-                        start_iso = datetime.fromisoformat(start.replace('Z', '+00:00')).isoformat()
-                    else:  # date format
-                        start_iso = datetime.fromisoformat(start).isoformat()
-                    
-                    if 'T' in end:
-                        end_iso = datetime.fromisoformat(end.replace('Z', '+00:00')).isoformat()
-                    else:
-                        end_iso = datetime.fromisoformat(end).isoformat()
-                except:
-                    start_iso = start
-                    end_iso = end
-                
-                # Extract attendees
-                attendees = []
-                for attendee in event.get('attendees', []):
-                    attendees.append({
-                        'email': attendee.get('email', ''),
-                        'display_name': attendee.get('displayName', ''),
-                        'response_status': attendee.get('responseStatus', 'needsAction')
-                    })
-                
-                calendar_data.append({
-                    'id': event['id'],
-                    'summary': event.get('summary', 'No Title'),
-                    'description': event.get('description', ''),
-                    'start': start_iso,
-                    'end': end_iso,
-                    'location': event.get('location', ''),
-                    'attendees': attendees,
-                    'creator': event.get('creator', {}).get('email', ''),
-                    'status': event.get('status', 'confirmed')
-                })
+                yield self._normalize_event(event)
+            
+            page_token = events_result.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def fetch_calendar_data(self, days_ahead: int = 7, max_results: Optional[int] = 50) -> List[Dict[str, Any]]:
+        """Fetch upcoming calendar events (max_results=None fetches every event in range)"""
+        try:
+            print(f"📅 Fetching calendar events for next {days_ahead} days...")
+            
+            calendar_data = list(self.iter_calendar_events(days_ahead=days_ahead, max_results=max_results))
             
             print(f"✅ Fetched {len(calendar_data)} calendar events")
             return calendar_data
@@ -238,16 +554,14 @@ class GoogleDataExtractor:
             
             # Validate email structure
             for email in data['emails']:
-                email_fields = ['id', 'subject', 'sender', 'date', 'snippet']
-                for field in email_fields:
+                for field in EMAIL_REQUIRED_FIELDS:
                     if field not in email:
                         print(f"❌ Missing email field: {field}")
                         return False
             
             # Validate calendar structure
             for event in data['calendar_events']:
-                event_fields = ['id', 'summary', 'start', 'end']
-                for field in event_fields:
+                for field in EVENT_REQUIRED_FIELDS:
                     if field not in event:
                         print(f"❌ Missing calendar field: {field}")
                         return False
@@ -259,13 +573,22 @@ class GoogleDataExtractor:
             print(f"❌ Output validation failed: {str(e)}")
             return False
     
-    def extract_all_data(self) -> Dict[str, Any]:
+    def extract_all_data(self, batch: bool = False, max_emails: Optional[int] = 50,
+                         max_events: Optional[int] = 50) -> Dict[str, Any]:
         """Extract all data from Google APIs"""
         print("🚀 Starting data extraction...")
         
         # Fetch data
-        emails = self.fetch_gmail_data()
-        calendar_events = self.fetch_calendar_data()
+        if self.workers > 1:
+            # Gmail and Calendar use separate service objects, so run them side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                emails_future = executor.submit(self.fetch_gmail_data, max_results=max_emails, batch=batch)
+                events_future = executor.submit(self.fetch_calendar_data, max_results=max_events)
+                emails = emails_future.result()
+                calendar_events = events_future.result()
+        else:
+            emails = self.fetch_gmail_data(max_results=max_emails, batch=batch)
+            calendar_events = self.fetch_calendar_data(max_results=max_events)
         
         # Create structured output
         output_data = {
@@ -281,6 +604,243 @@ class GoogleDataExtractor:
         
         return output_data
     
+    def load_sync_state(self, filename: str = SYNC_STATE_FILE) -> Dict[str, Any]:
+        """Load incremental sync checkpoints, or an empty state if none exist"""
+        try:
+            if os.path.exists(filename):
+                with open(filename, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable sync state {filename}: {str(e)}")
+        return {}
+    
+    def save_sync_state(self, state: Dict[str, Any], filename: str = SYNC_STATE_FILE) -> bool:
+        """Atomically persist incremental sync checkpoints"""
+        try:
+            tmp_filename = f"{filename}.tmp"
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_filename, filename)
+            return True
+        except Exception as e:
+            print(f"❌ Error saving sync state: {str(e)}")
+            return False
+    
+    def _get_messages(self, message_ids: List[str], batch: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Fetch message details by ID, omitting messages that no longer exist"""
+        if batch:
+            return self._batch_get_messages(message_ids)
+        
+        def get_or_none(message_id: str) -> Optional[Dict[str, Any]]:
+            try:
+                return self._get_message(message_id)
+            except HttpError as error:
+                if error.resp.status != 404:
+                    raise
+                return None
+        
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(get_or_none, message_ids))
+        else:
+            results = [get_or_none(message_id) for message_id in message_ids]
+        
+        return {
+            message_id: msg_detail
+            for message_id, msg_detail in zip(message_ids, results)
+            if msg_detail is not None
+        }
+    
+    def sync_emails(self, history_id: Optional[str], batch: bool = False,
+                    max_results: Optional[int] = 50) -> Dict[str, Any]:
+        """Fetch INBOX changes since history_id, or do a full sync without one
+        
+        Returns the upserted email records, the IDs of messages that were deleted
+        or left the INBOX, the new historyId checkpoint and the sync mode used.
+        """
+        if history_id:
+            try:
+                changes: Dict[str, bool] = {}  # message ID -> still in INBOX
+                new_history_id = history_id
+                page_token = None
+                
+                while True:
+                    results = self._execute(
+                        self.gmail_service.users().history().list(
+                            userId='me',
+                            startHistoryId=history_id,
+                            labelId='INBOX',
+                            historyTypes=['messageAdded', 'messageDeleted', 'labelAdded', 'labelRemoved'],
+                            maxResults=GMAIL_PAGE_SIZE,
+                            pageToken=page_token,
+                            **self._fields(GMAIL_HISTORY_FIELDS)
+                        ),
+                        self.gmail_limiter,
+                        GMAIL_QUOTA_COSTS['history.list']
+                    )
+                    
+                    for record in results.get('history', []):
+                        for item in record.get('messagesAdded', []) + record.get('labelsAdded', []):
+                            if 'INBOX' in item['message'].get('labelIds', []):
+                                changes[item['message']['id']] = True
+                        for item in record.get('messagesDeleted', []):
+                            changes[item['message']['id']] = False
+                        for item in record.get('labelsRemoved', []):
+                            if 'INBOX' in item.get('labelIds', []):
+                                changes[item['message']['id']] = False
+                    
+                    new_history_id = results.get('historyId', new_history_id)
+                    page_token = results.get('nextPageToken')
+                    if not page_token:
+                        break
+                
+                upsert_ids = [message_id for message_id, in_inbox in changes.items() if in_inbox]
+                deleted_ids = [message_id for message_id, in_inbox in changes.items() if not in_inbox]
+                details = self._get_messages(upsert_ids, batch=batch)
+                # Messages removed between history.list and get count as deleted
+                deleted_ids.extend(message_id for message_id in upsert_ids if message_id not in details)
+                
+                return {
+                    'mode': 'incremental',
+                    'emails': [
+                        self._normalize_email(message_id, details[message_id])
+                        for message_id in upsert_ids
+                        if message_id in details
+                    ],
+                    'deleted_ids': deleted_ids,
+                    'history_id': new_history_id
+                }
+            except HttpError as error:
+                if not _is_sync_expired(error):
+                    raise
+                print("⚠️  Gmail historyId expired, falling back to full sync")
+        
+        # Record the checkpoint before listing so changes made during the
+        # full sync are picked up by the next incremental run
+        profile = self._execute(
+            self.gmail_service.users().getProfile(userId='me'),
+            self.gmail_limiter,
+            GMAIL_QUOTA_COSTS['getProfile']
+        )
+        return {
+            'mode': 'full',
+            'emails': list(self.iter_emails(max_results=max_results, batch=batch)),
+            'deleted_ids': [],
+            'history_id': profile.get('historyId')
+        }
+    
+    def sync_calendar_events(self, sync_token: Optional[str]) -> Dict[str, Any]:
+        """Fetch primary calendar changes since sync_token, or do a full sync without one
+        
+        A full sync lists every event from now onwards; timeMax and orderBy are
+        omitted because the Calendar API only issues sync tokens without them.
+        """
+        params = {
+            'calendarId': 'primary',
+            'singleEvents': True,
+            'maxResults': CALENDAR_PAGE_SIZE,
+            **self._fields(CALENDAR_EVENT_FIELDS)
+        }
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            params['timeMin'] = datetime.utcnow().isoformat() + 'Z'
+        
+        events: List[Dict[str, Any]] = []
+        deleted_ids: List[str] = []
+        page_token = None
+        
+        try:
+            while True:
+                events_result = self._execute(
+                    self.calendar_service.events().list(pageToken=page_token, **params),
+                    self.calendar_limiter
+                )
+                
+                for event in events_result.get('items', []):
+                    # Cancelled events in a change feed only carry id and status
+                    if event.get('status') == 'cancelled':
+                        deleted_ids.append(event['id'])
+                    else:
+                        events.append(self._normalize_event(event))
+                
+                page_token = events_result.get('nextPageToken')
+                if not page_token:
+                    break
+        except HttpError as error:
+            if not (sync_token and _is_sync_expired(error)):
+                raise
+            print("⚠️  Calendar syncToken expired, falling back to full sync")
+            return self.sync_calendar_events(None)
+        
+        return {
+            'mode': 'incremental' if sync_token else 'full',
+            'calendar_events': events,
+            'deleted_ids': deleted_ids,
+            'sync_token': events_result.get('nextSyncToken')
+        }
+    
+    def commit_sync_state(self, state_file: str = SYNC_STATE_FILE) -> bool:
+        """Persist the checkpoints from the last extract_incremental run"""
+        if self.pending_sync_state is None:
+            return False
+        if not self.save_sync_state(self.pending_sync_state, state_file):
+            return False
+        self.pending_sync_state = None
+        return True
+    
+    def extract_incremental(self, state_file: str = SYNC_STATE_FILE, batch: bool = False,
+                            max_emails: Optional[int] = 50) -> Dict[str, Any]:
+        """Extract only what changed since the last run, using stored sync checkpoints
+        
+        The returned data has the same shape as extract_all_data, plus a
+        'deleted' section listing removed email and event IDs. The new
+        checkpoints are held back until commit_sync_state is called, so a run
+        whose output is never saved is re-synced next time.
+        """
+        print("🚀 Starting incremental data extraction...")
+        
+        state = self.load_sync_state(state_file)
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                gmail_future = executor.submit(
+                    self.sync_emails, state.get('gmail_history_id'), batch=batch, max_results=max_emails
+                )
+                calendar_future = executor.submit(self.sync_calendar_events, state.get('calendar_sync_token'))
+                gmail_sync = gmail_future.result()
+                calendar_sync = calendar_future.result()
+        else:
+            gmail_sync = self.sync_emails(state.get('gmail_history_id'), batch=batch, max_results=max_emails)
+            calendar_sync = self.sync_calendar_events(state.get('calendar_sync_token'))
+        
+        print(f"✅ Gmail {gmail_sync['mode']} sync: {len(gmail_sync['emails'])} changed, "
+              f"{len(gmail_sync['deleted_ids'])} removed")
+        print(f"✅ Calendar {calendar_sync['mode']} sync: {len(calendar_sync['calendar_events'])} changed, "
+              f"{len(calendar_sync['deleted_ids'])} removed")
+        
+        self.pending_sync_state = {
+            'gmail_history_id': gmail_sync['history_id'],
+            'calendar_sync_token': calendar_sync['sync_token'],
+            'updated_at': datetime.now().isoformat()
+        }
+        
+        return {
+            'metadata': {
+                'extracted_at': datetime.now().isoformat(),
+                'total_emails': len(gmail_sync['emails']),
+                'total_calendar_events': len(calendar_sync['calendar_events']),
+                'gmail_sync_mode': gmail_sync['mode'],
+                'calendar_sync_mode': calendar_sync['mode'],
+                'version': '1.0'
+            },
+            'emails': gmail_sync['emails'],
+            'calendar_events': calendar_sync['calendar_events'],
+            'deleted': {
+                'emails': gmail_sync['deleted_ids'],
+                'calendar_events': calendar_sync['deleted_ids']
+            }
+        }
+    
     def save_to_json(self, data: Dict[str, Any], filename: str) -> bool:
         """Save data to JSON file"""
         try:
@@ -292,6 +852,78 @@ class GoogleDataExtractor:
             print(f"❌ Error saving JSON: {str(e)}")
             return False
     
+    def _open_output(self, filename: str, compression: str = 'none'):
+        """Open a text stream for writing, optionally gzip or zstd compressed"""
+        if compression == 'gzip':
+            return gzip.open(filename, 'wt', encoding='utf-8')
+        if compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("zstd compression requires the zstandard package. Run: pip install zstandard")
+            raw = open(filename, 'wb')
+            return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding='utf-8')
+        return open(filename, 'w', encoding='utf-8')
+    
+    def save_to_jsonl(self, filename: str, emails: Iterable[Dict[str, Any]],
+                      calendar_events: Iterable[Dict[str, Any]],
+                      metadata: Optional[Dict[str, Any]] = None,
+                      deleted: Optional[Dict[str, List[str]]] = None,
+                      compression: str = 'none') -> bool:
+        """Stream records to a JSON Lines file as they are produced
+        
+        Each line is one record tagged with a 'type' of email, calendar_event,
+        deleted_email or deleted_calendar_event, followed by a trailing metadata
+        record with the totals. emails and calendar_events may be lazy iterators
+        (e.g. iter_emails), so the extract never has to fit in memory. The file
+        is written under a temporary name and renamed into place on success.
+        """
+        tmp_filename = f"{filename}.tmp"
+        try:
+            total_emails = 0
+            total_calendar_events = 0
+            
+            with self._open_output(tmp_filename, compression) as f:
+                def write(record_type: str, record: Dict[str, Any]) -> None:
+                    f.write(json.dumps({'type': record_type, **record}, ensure_ascii=False))
+                    f.write('\n')
+                
+                for email in emails:
+                    missing = [field for field in EMAIL_REQUIRED_FIELDS if field not in email]
+                    if missing:
+                        raise ValueError(f"Missing email field: {missing[0]}")
+                    write('email', email)
+                    total_emails += 1
+                
+                for event in calendar_events:
+                    missing = [field for field in EVENT_REQUIRED_FIELDS if field not in event]
+                    if missing:
+                        raise ValueError(f"Missing calendar field: {missing[0]}")
+                    write('calendar_event', event)
+                    total_calendar_events += 1
+                
+                for email_id in (deleted or {}).get('emails', []):
+                    write('deleted_email', {'id': email_id})
+                for event_id in (deleted or {}).get('calendar_events', []):
+                    write('deleted_calendar_event', {'id': event_id})
+                
+                write('metadata', {
+                    **(metadata or {}),
+                    'extracted_at': (metadata or {}).get('extracted_at', datetime.now().isoformat()),
+                    'total_emails': total_emails,
+                    'total_calendar_events': total_calendar_events,
+                    'version': '1.0'
+                })
+            
+            os.replace(tmp_filename, filename)
+            print(f"✅ Streamed {total_emails} emails and {total_calendar_events} events to {filename}")
+            return True
+        except Exception as e:
+            print(f"❌ Error saving JSON Lines: {str(e)}")
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            return False
+    
     def save_to_markdown(self, data: Dict[str, Any], filename: str) -> bool:
         """Save data to Markdown file"""
         try:
@@ -334,17 +966,35 @@ class GoogleDataExtractor:
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(description='Extract data from Google APIs')
-    parser.add_argument('--output-format', choices=['json', 'md'], default='json',
-                       help='Output format (json or md)')
+    parser.add_argument('--output-format', choices=['json', 'jsonl', 'md'], default='json',
+                       help='Output format (json, jsonl or md)')
+    parser.add_argument('--compression', choices=list(COMPRESSION_SUFFIXES), default='none',
+                       help='Compression for jsonl output')
     parser.add_argument('--test', action='store_true',
                        help='Test API access without fetching data')
     parser.add_argument('--validate-only', action='store_true',
                        help='Only validate output format without saving')
+    parser.add_argument('--batch', action='store_true',
+                       help='Fetch Gmail message details using batch HTTP requests')
+    parser.add_argument('--max-emails', type=int, default=50,
+                       help='Maximum number of emails to fetch (0 = all)')
+    parser.add_argument('--max-events', type=int, default=50,
+                       help='Maximum number of calendar events to fetch (0 = all)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only fetch changes since the last run (Gmail historyId / Calendar syncToken)')
+    parser.add_argument('--state-file', default=SYNC_STATE_FILE,
+                       help='Sync checkpoint file used by --incremental')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker threads for concurrent fetching (1 = serial)')
+    parser.add_argument('--lean', action='store_true',
+                       help='Fetch metadata-only messages with partial-response field masks')
+    parser.add_argument('--store', default=None,
+                       help='Also upsert records into this SQLite store (see google_data_store.py)')
     
     args = parser.parse_args()
     
     # Initialize extractor
-    extractor = GoogleDataExtractor()
+    extractor = GoogleDataExtractor(workers=args.workers, lean=args.lean)
     
     # Authenticate
     if not extractor.authenticate():
@@ -362,10 +1012,25 @@ def main():
             sys.exit(1)
     
     # Extract data
-    data = extractor.extract_all_data()
+    streaming = args.output_format == 'jsonl' and not args.incremental and not args.validate_only
+    if streaming:
+        # Records are fetched lazily by save_to_jsonl and validated as they are written
+        data = None
+    elif args.incremental:
+        data = extractor.extract_incremental(
+            state_file=args.state_file,
+            batch=args.batch,
+            max_emails=args.max_emails or None
+        )
+    else:
+        data = extractor.extract_all_data(
+            batch=args.batch,
+            max_emails=args.max_emails or None,
+            max_events=args.max_events or None
+        )
     
     # Validate output
-    if not extractor.validate_output_format(data):
+    if data is not None and not extractor.validate_output_format(data):
         print("❌ Output validation failed. Exiting.")
         sys.exit(1)
     
@@ -376,12 +1041,39 @@ def main():
     
     # Save output
     output_filename = f"google_data_output.{args.output_format}"
+    store = GoogleDataStore(args.store) if args.store else None
     
     if args.output_format == 'json':
         success = extractor.save_to_json(data, output_filename)
+    elif args.output_format == 'jsonl':
+        output_filename += COMPRESSION_SUFFIXES[args.compression]
+        if streaming:
+            emails = extractor.iter_emails(max_results=args.max_emails or None, batch=args.batch)
+            calendar_events = extractor.iter_calendar_events(max_results=args.max_events or None)
+            if store:
+                emails = store.upsert_stream('emails', emails)
+                calendar_events = store.upsert_stream('calendar_events', calendar_events)
+            success = extractor.save_to_jsonl(output_filename, emails, calendar_events, compression=args.compression)
+        else:
+            success = extractor.save_to_jsonl(
+                output_filename,
+                data['emails'],
+                data['calendar_events'],
+                metadata=data['metadata'],
+                deleted=data.get('deleted'),
+                compression=args.compression
+            )
     else:  # markdown
         success = extractor.save_to_markdown(data, output_filename)
     
+    if success and store and not streaming:
+        store.save_extract(data)
+    if store:
+        store.close()
+    
+    if success and args.incremental:
+        success = extractor.commit_sync_state(args.state_file)
+    
     if success:
         print(f"🎉 Extraction completed successfully!")
         print(f"📁 Output saved to: {os.path.abspath(output_filename)}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Google Data Extractor Daemon
+
+Keeps one authenticated GoogleDataExtractor alive and serves it over a local
+HTTP endpoint (TCP on localhost or a Unix socket), so callers skip interpreter
+startup, imports and OAuth on every request.
+Usage: python extractor_daemon.py [--port 8765 | --socket /tmp/friday-extractor.sock]
+
+Requests are JSON POSTs to /<method>, e.g.
+    curl -X POST localhost:8765/fetch_emails -d '{"max_results": 20}'
+and return {"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+Identical concurrent requests share a single fetch, and results are cached
+for --cache-ttl seconds (pass "refresh": true to bypass the cache).
+"""
+
+import argparse
+import inspect
+import json
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from extract_google_data import GoogleDataExtractor
+from local_server import JsonRequestHandler, serve
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_TTL = 30.0
+
+class RpcError(Exception):
+    """Client-side RPC error, reported with an HTTP status code"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class ExtractorService:
+    """RPC methods over a shared extractor, with request coalescing and a TTL cache"""
+
+    def __init__(self, extractor: GoogleDataExtractor, cache_ttl: float = DEFAULT_CACHE_TTL):
+        self.extractor = extractor
+        self.cache_ttl = cache_ttl
+        self.methods: Dict[str, Callable[..., Any]] = {
+            'fetch_emails': self.fetch_emails,
+            'fetch_events': self.fetch_events,
+            'test_api_access': self.test_api_access,
+        }
+        # Service objects are not thread-safe, so API work is serialized here;
+        # concurrency comes from coalescing identical requests and the cache
+        self.api_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.in_flight: Dict[str, Future] = {}
+        self.cache: Dict[str, Tuple[float, Any]] = {}
+
+    # As with the CLI's --max-emails/--max-events, max_results 0 means no limit
+    def fetch_emails(self, max_results: Optional[int] = 50, batch: bool = False):
+        return list(self.extractor.iter_emails(max_results=max_results or None, batch=batch))
+
+    def fetch_events(self, days_ahead: int = 7, max_results: Optional[int] = 50):
+        return list(self.extractor.iter_calendar_events(days_ahead=days_ahead, max_results=max_results or None))
+
+    def test_api_access(self):
+        return self.extractor.test_api_access()
+
+    def call(self, method: str, params: Dict[str, Any]) -> Any:
+        """Run an RPC method, sharing in-flight calls and recent results"""
+        if method not in self.methods:
+            raise RpcError(404, f"Unknown method: {method}")
+
+        refresh = bool(params.pop('refresh', False))
+        try:
+            inspect.signature(self.methods[method]).bind(**params)
+        except TypeError as e:
+            raise RpcError(400, f"Invalid parameters: {e}")
+        key = f"{method}:{json.dumps(params, sort_keys=True)}"
+
+        with self.state_lock:
+            cached = self.cache.get(key)
+            if cached and not refresh and cached[0] > time.monotonic():
+                return cached[1]
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            with self.api_lock:
+                result = self.methods[method](**params)
+            with self.state_lock:
+                now = time.monotonic()
+                self.cache = {k: v for k, v in self.cache.items() if v[0] > now}
+                self.cache[key] = (now + self.cache_ttl, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.state_lock:
+                self.in_flight.pop(key, None)
+
+def make_handler(service: ExtractorService):
+    """Build a request handler class bound to an ExtractorService"""
+
+    class Handler(JsonRequestHandler):
+        log_prefix = '📡'
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'ok': True, 'methods': sorted(service.methods)})
+            else:
+                self._send_json(404, {'ok': False, 'error': 'Not found'})
+
+        def do_POST(self):
+            method = self.path.strip('/')
+            try:
+                params = self._read_json_object()
+            except ValueError as e:
+                self._send_json(400, {'ok': False, 'error': f"Invalid request: {e}"})
+                return
+
+            try:
+                result = service.call(method, params)
+                self._send_json(200, {'ok': True, 'result': result})
+            except RpcError as e:
+                self._send_json(e.status, {'ok': False, 'error': str(e)})
+            except Exception as e:
+                self._send_json(502, {'ok': False, 'error': str(e)})
+
+    return Handler
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Serve GoogleDataExtractor over a local endpoint')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port on 127.0.0.1')
+    parser.add_argument('--socket', default=None, help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL,
+                       help='Seconds to reuse identical responses')
+    parser.add_argument('--lean', action='store_true',
+                       help='Fetch metadata-only messages with partial-response field masks')
+
+    args = parser.parse_args()
+
+    extractor = GoogleDataExtractor(lean=args.lean)
+    if not extractor.authenticate():
+        print("❌ Failed to authenticate. Exiting.")
+        sys.exit(1)
+
+    handler = make_handler(ExtractorService(extractor, cache_ttl=args.cache_ttl))
+    serve(handler, 'Extractor daemon', args.port, args.socket)
+
+if __name__ == '__main__':
+    main()
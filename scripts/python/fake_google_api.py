@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Fake Google API Server
+
+Serves synthetic Gmail and Calendar responses on localhost so the extractor
+can be benchmarked without a Google account.
+Usage: python fake_google_api.py [--port 8799] [--messages 5000] [--events 500]
+                                 [--payload-bytes 2000] [--latency-ms 20] [--error-rate 0.01]
+
+Implements Gmail messages.list, messages.get (full and metadata formats),
+history.list, getProfile and the /batch/gmail/v1 multipart endpoint, plus
+Calendar events.list with sync tokens. Mailbox contents are generated from
+the message index on request, so the server's memory stays flat whatever
+the mailbox size. Every call waits --latency-ms, and --error-rate of calls
+(including individual batch items) answer 429 rateLimitExceeded.
+
+Services reach it by replacing rootUrl in the discovery document (see
+benchmark_extractor.py offline). GET /_stats returns per-method call counts
+and POST /_reset clears them.
+"""
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PORT = 8799
+# Returned by getProfile; history.list reports the same value
+CURRENT_HISTORY_ID = '100000'
+BATCH_BOUNDARY = 'fake_google_api_batch'
+
+FILLER_HEADERS = [
+    'Delivered-To', 'Received', 'X-Received', 'ARC-Seal', 'ARC-Message-Signature',
+    'Return-Path', 'Received-SPF', 'Authentication-Results', 'DKIM-Signature',
+    'MIME-Version', 'Message-ID', 'To', 'Content-Type', 'List-Unsubscribe'
+]
+
+class FakeMailbox:
+    """Deterministic synthetic Gmail and Calendar data, generated per request"""
+
+    def __init__(self, messages: int = 5000, events: int = 500, payload_bytes: int = 2000,
+                 history_changes: int = 100):
+        self.messages = messages
+        self.events = events
+        self.payload_bytes = payload_bytes
+        self.history_changes = history_changes
+
+    @staticmethod
+    def message_id(index: int) -> str:
+        return f'{index + 1:016x}'
+
+    def message(self, message_id: str, metadata_only: bool) -> Optional[Dict[str, Any]]:
+        """Message resource by ID; None for IDs outside the mailbox"""
+        try:
+            index = int(message_id, 16) - 1
+        except ValueError:
+            return None
+        if not 0 <= index < self.messages:
+            return None
+
+        sent = 1700000000 - index * 600
+        headers = [
+            {'name': 'Subject', 'value': f'Tilbud på opgave #{index}'},
+            {'name': 'From', 'value': f'Kunde {index % 500} <kunde{index % 500}@example.dk>'},
+            {'name': 'Date', 'value': time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(sent))},
+        ]
+        resource: Dict[str, Any] = {
+            'id': message_id,
+            'threadId': f'{index // 3 + 1:016x}',
+            'labelIds': ['INBOX', 'UNREAD'] if index % 4 == 0 else ['INBOX'],
+            'snippet': 'Hej, jeg vil gerne have et tilbud på rengøring ' * 3,
+            'internalDate': str(sent * 1000),
+            'sizeEstimate': self.payload_bytes,
+        }
+        if metadata_only:
+            resource['payload'] = {'mimeType': 'text/plain', 'headers': headers}
+            return resource
+
+        body = ('Lorem ipsum dolor sit amet. ' * (self.payload_bytes // 28 + 1))[:self.payload_bytes]
+        resource['payload'] = {
+            'mimeType': 'text/plain',
+            'headers': [{'name': name, 'value': f'{name.lower()}-{index}'} for name in FILLER_HEADERS] + headers,
+            'body': {
+                'size': len(body),
+                'data': base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')
+            }
+        }
+        return resource
+
+    def list_messages(self, page_token: Optional[str], max_results: int) -> Dict[str, Any]:
+        offset = int(page_token or 0)
+        end = min(self.messages, offset + max_results)
+        result: Dict[str, Any] = {
+            'messages': [{'id': self.message_id(i), 'threadId': f'{i // 3 + 1:016x}'} for i in range(offset, end)],
+            'resultSizeEstimate': self.messages
+        }
+        if end < self.messages:
+            result['nextPageToken'] = str(end)
+        return result
+
+    def list_history(self, page_token: Optional[str], max_results: int) -> Dict[str, Any]:
+        """The newest history_changes messages were added; every tenth added one was deleted again"""
+        changes = min(self.history_changes, self.messages)
+        offset = int(page_token or 0)
+        end = min(changes, offset + max_results)
+        history = []
+        for i in range(offset, end):
+            message = {'id': self.message_id(i), 'threadId': f'{i // 3 + 1:016x}', 'labelIds': ['INBOX']}
+            record: Dict[str, Any] = {'id': str(int(CURRENT_HISTORY_ID) - changes + i), 'messages': [message]}
+            if i % 10 == 9:
+                record['messagesDeleted'] = [{'message': message}]
+            else:
+                record['messagesAdded'] = [{'message': message}]
+            history.append(record)
+        result: Dict[str, Any] = {'history': history, 'historyId': CURRENT_HISTORY_ID}
+        if end < changes:
+            result['nextPageToken'] = str(end)
+        return result
+
+    def event(self, index: int) -> Dict[str, Any]:
+        start = 1700000000 + index * 3600
+        return {
+            'id': f'event{index}',
+            'status': 'confirmed',
+            'summary': f'Rengøring hos kunde {index % 200}',
+            'description': 'Standard rengøring, nøgle under måtten. ' * 2,
+            'location': f'Testvej {index % 100}, 8000 Aarhus',
+            'creator': {'email': 'planner@example.dk'},
+            'start': {'dateTime': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(start))},
+            'end': {'dateTime': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(start + 7200))},
+            'attendees': [
+                {'email': f'kunde{index % 200}@example.dk', 'responseStatus': 'accepted'},
+                {'email': 'team@example.dk', 'displayName': 'Team', 'responseStatus': 'needsAction'}
+            ]
+        }
+
+    def list_events(self, page_token: Optional[str], max_results: int, sync_token: Optional[str]) -> Dict[str, Any]:
+        """All events, or with a sync token the first history_changes of them"""
+        total = min(self.history_changes, self.events) if sync_token else self.events
+        offset = int(page_token or 0)
+        end = min(total, offset + max_results)
+        result: Dict[str, Any] = {'kind': 'calendar#events', 'items': [self.event(i) for i in range(offset, end)]}
+        if end < total:
+            result['nextPageToken'] = str(end)
+        else:
+            result['nextSyncToken'] = 'sync-token'
+        return result
+
+class FakeGoogleApi:
+    """Request routing, injected latency and 429s, and per-method call counts"""
+
+    def __init__(self, mailbox: FakeMailbox, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 42):
+        self.mailbox = mailbox
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def _throttled(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.error_rate
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts = {}
+
+    def handle(self, method: str, target: str) -> Tuple[int, Dict[str, Any]]:
+        """Answer one API call with (status, JSON body)"""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+        page_token = query.get('pageToken')
+        max_results = int(query.get('maxResults', 100))
+
+        if parts[:4] == ['gmail', 'v1', 'users', 'me']:
+            resource = parts[4:]
+            if resource == ['messages']:
+                name, handler = 'messages.list', lambda: self.mailbox.list_messages(page_token, max_results)
+            elif len(resource) == 2 and resource[0] == 'messages':
+                name, handler = 'messages.get', lambda: self.mailbox.message(resource[1], query.get('format') == 'metadata')
+            elif resource == ['history']:
+                name, handler = 'history.list', lambda: self.mailbox.list_history(page_token, max_results)
+            elif resource == ['profile']:
+                name, handler = 'getProfile', lambda: {'emailAddress': 'bench@example.dk', 'historyId': CURRENT_HISTORY_ID}
+            else:
+                return 404, _error(404, 'Not Found')
+        elif parts[-3:] == ['calendars', 'primary', 'events']:
+            name, handler = 'events.list', lambda: self.mailbox.list_events(page_token, max_results, query.get('syncToken'))
+        else:
+            return 404, _error(404, 'Not Found')
+
+        self._count(name)
+        if self._throttled():
+            self._count('throttled')
+            return 429, _error(429, 'Rate Limit Exceeded', 'rateLimitExceeded')
+        body = handler()
+        if body is None:
+            return 404, _error(404, 'Requested entity was not found.')
+        return 200, body
+
+    def handle_batch(self, content_type: str, body: bytes) -> bytes:
+        """Answer a multipart/mixed batch with one application/http part per call"""
+        self._count('batch')
+        message = BytesParser(policy=HTTP).parsebytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode('ascii') + body
+        )
+        chunks: List[str] = []
+        for part in message.iter_parts():
+            # application/http parts come back as bytes: the embedded request line first
+            request_line = part.get_payload(decode=True).decode('utf-8').splitlines()[0]
+            method, target = request_line.split(' ')[:2]
+            status, payload = self.handle(method, target)
+            chunks.append(
+                f'--{BATCH_BOUNDARY}\r\n'
+                'Content-Type: application/http\r\n'
+                f"Content-ID: <response-{part['Content-ID'].strip('<>')}>\r\n\r\n"
+                f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+                'Content-Type: application/json; charset=UTF-8\r\n\r\n'
+                f'{json.dumps(payload, ensure_ascii=False)}\r\n'
+            )
+        chunks.append(f'--{BATCH_BOUNDARY}--\r\n')
+        return ''.join(chunks).encode('utf-8')
+
+def _error(code: int, message: str, reason: str = 'notFound') -> Dict[str, Any]:
+    return {'error': {'code': code, 'message': message, 'errors': [{'reason': reason, 'message': message}]}}
+
+def make_handler(api: FakeGoogleApi):
+    """Build a request handler class bound to a FakeGoogleApi"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; Nagle would hold the body for a delayed ACK
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: bytes, content_type: str = 'application/json; charset=UTF-8') -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+        def do_GET(self):
+            if self.path == '/_stats':
+                with api.lock:
+                    self._send_json(200, dict(api.counts))
+                return
+            time.sleep(api.latency)
+            self._send_json(*api.handle('GET', self.path))
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            if self.path == '/_reset':
+                api.reset()
+                self._send_json(200, {'ok': True})
+            elif self.path.startswith('/batch'):
+                time.sleep(api.latency)
+                self._send(200, api.handle_batch(self.headers['Content-Type'], body),
+                           f'multipart/mixed; boundary={BATCH_BOUNDARY}')
+            else:
+                self._send_json(404, _error(404, 'Not Found'))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Serve synthetic Gmail and Calendar API responses')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port on 127.0.0.1 (0 picks a free one)')
+    parser.add_argument('--messages', type=int, default=5000, help='INBOX size')
+    parser.add_argument('--events', type=int, default=500, help='Calendar events')
+    parser.add_argument('--payload-bytes', type=int, default=2000, help='Message body size in full format')
+    parser.add_argument('--history-changes', type=int, default=100,
+                       help='Changes returned to incremental Gmail and Calendar syncs')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every HTTP request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with 429')
+    parser.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args()
+
+    mailbox = FakeMailbox(args.messages, args.events, args.payload_bytes, args.history_changes)
+    api = FakeGoogleApi(mailbox, args.latency_ms, args.error_rate, args.seed)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(api))
+    server.daemon_threads = True
+    # First line of output tells a parent process where to connect
+    print(json.dumps({'port': server.server_address[1]}), flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
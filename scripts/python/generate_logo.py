@@ -1,8 +1,32 @@
 import argparse
+import gc
+import json
 import os
+import re
 import sys
+import time
 from pathlib import Path
 
+from logo_cache import DEFAULT_CACHE_DIR, LogoCache, path_fingerprint
+
+DEFAULT_BASE_DIR = str(Path("models/Qwen-Image-base"))
+DEFAULT_LORA_PATH = str(Path("models/Lightning/Qwen-Image-Lightning-4steps-V2.0.safetensors"))
+DEFAULT_FUSED_DIR = str(Path("models/Qwen-Image-Lightning-fused"))
+# Images per pipeline call in batch mode
+DEFAULT_MAX_BATCH = 4
+# Longest side of latent preview images
+PREVIEW_SIZE = 256
+FUSED_MARKER = "fused_lora.json"
+# Memory-map safetensors shards and create weights in place, without a float32 staging copy
+LOW_MEMORY_LOAD = {"low_cpu_mem_usage": True, "use_safetensors": True}
+
+class LogoError(Exception):
+    """Generation failure carrying the CLI exit code for its stage"""
+
+    def __init__(self, message: str, exit_code: int):
+        super().__init__(message)
+        self.exit_code = exit_code
+
 def _eprint(msg: str):
     print(msg, file=sys.stderr)
 
@@ -22,77 +46,797 @@ def build_prompt(company: str, colors: str, style: str, industry: str) -> str:
     )
     return base
 
-def main():
-    parser = argparse.ArgumentParser(prog="generate_logo", add_help=True)
-    parser.add_argument("--company", required=True)
-    parser.add_argument("--colors", default="#00897b,#00acc1")
-    parser.add_argument("--style", default="minimalist")
-    parser.add_argument("--industry", default="cleaning")
-    parser.add_argument("--prompt", default=None)
-    parser.add_argument("--steps", type=int, default=4)
-    parser.add_argument("--cfg", type=float, default=1.0)
-    parser.add_argument("--height", type=int, default=1024)
-    parser.add_argument("--width", type=int, default=1024)
-    parser.add_argument("--device", default="auto")
-    parser.add_argument("--base_dir", default=str(Path("models/Qwen-Image-base")))
-    parser.add_argument("--lora_path", default=str(Path("models/Lightning/Qwen-Image-Lightning-4steps-V2.0.safetensors")))
-    parser.add_argument("--output", default=None)
+def resolve_device(device: str) -> str:
+    return "cuda" if (device == "auto" and _has_cuda()) else (device if device != "auto" else "cpu")
 
-    args = parser.parse_args()
+def _slug(text: str) -> str:
+    # Company names become file names; anything but [a-z0-9-] (including "/" and "..") is replaced
+    return re.sub(r"[^a-z0-9-]+", "-", text.lower()).strip("-") or "logo"
+
+def output_path(company: str, output=None) -> Path:
+    """A file in client/public; directory parts of output are dropped"""
+    out_name = Path(output).name if output else f"{_slug(company)}-logo.png"
+    return Path.cwd() / "client" / "public" / out_name
+
+def parse_seeds(seeds=None, num_images: int = 1, seed=None) -> list:
+    """Explicit comma-separated seeds, else num_images consecutive seeds from seed (default 0)"""
+    if seeds:
+        return [int(s) for s in str(seeds).split(",") if s.strip()]
+    start = int(seed) if seed is not None else 0
+    return list(range(start, start + int(num_images)))
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _cpu_supports_bf16(torch) -> bool:
+    cpu = getattr(torch, "cpu", None)
+    checks = [getattr(cpu, name, None) for name in ("_is_avx512_bf16_supported", "_is_amx_tile_supported")]
+    return any(check() for check in checks if check is not None)
+
+def resolve_dtype(torch, dtype: str, device: str):
+    """auto: float16 on CUDA, else float32; cpu-auto: bfloat16 on CPUs with native bf16 support"""
+    if device == "cuda" and dtype in ("auto", "cpu-auto"):
+        return torch.float16
+    if dtype == "cpu-auto":
+        return torch.bfloat16 if _cpu_supports_bf16(torch) else torch.float32
+    if dtype == "auto":
+        return torch.float32
+    return getattr(torch, dtype)
+
+def _fused_signature(lora_path: Path, dtype) -> dict:
+    # Fused weights are saved in the dtype they were fused in, so a bf16 fuse can't serve float32 runs
+    stat = lora_path.stat()
+    return {"lora_path": str(lora_path.resolve()), "size": stat.st_size, "mtime": stat.st_mtime, "dtype": str(dtype)}
+
+def fuse_lora(base_dir: Path, lora_path: Path, fused_dir: Path, dtype) -> None:
+    """Bake the Lightning LoRA into the base weights once and save the result"""
+    from diffusers import DiffusionPipeline
+
+    pipe = DiffusionPipeline.from_pretrained(str(base_dir), torch_dtype=dtype, **LOW_MEMORY_LOAD)
+    pipe.load_lora_weights(str(lora_path))
+    pipe.fuse_lora()
+    pipe.unload_lora_weights()
+    pipe.save_pretrained(str(fused_dir), safe_serialization=True)
+    (fused_dir / FUSED_MARKER).write_text(json.dumps(_fused_signature(lora_path, dtype)), encoding="utf-8")
+    del pipe
+
+def _fused_is_current(fused_dir: Path, lora_path: Path, dtype) -> bool:
+    try:
+        marker = json.loads((fused_dir / FUSED_MARKER).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if marker.get("dtype") != str(dtype):
+        return False
+    return not lora_path.exists() or marker == _fused_signature(lora_path, dtype)
 
+def optimize_pipeline(pipe, torch, channels_last: bool = False, torch_compile: bool = False,
+                      attention_slicing: bool = False, vae_tiling: bool = False) -> None:
+    """Apply the optional CPU/GPU performance settings to a loaded pipeline"""
+    denoiser = getattr(pipe, "transformer", None) or getattr(pipe, "unet", None)
+    if channels_last:
+        # Only convolutional modules benefit; the Qwen-Image transformer is linear layers
+        for module in (getattr(pipe, "vae", None), getattr(pipe, "unet", None)):
+            if module is not None:
+                module.to(memory_format=torch.channels_last)
+    if attention_slicing and hasattr(pipe, "enable_attention_slicing"):
+        pipe.enable_attention_slicing()
+    if vae_tiling:
+        if hasattr(pipe, "enable_vae_tiling"):
+            pipe.enable_vae_tiling()
+        elif hasattr(getattr(pipe, "vae", None), "enable_tiling"):
+            pipe.vae.enable_tiling()
+    if torch_compile and denoiser is not None:
+        compiled = torch.compile(denoiser)
+        if hasattr(pipe, "transformer"):
+            pipe.transformer = compiled
+        else:
+            pipe.unet = compiled
+
+class StagedPipeline:
+    """Qwen-Image pipeline that holds one group of components in memory at a time
+
+    Each call loads the text encoder, encodes the prompts and frees it, then
+    loads the transformer and VAE, denoises from the prompt embeddings and
+    frees those too, so peak RSS is the larger stage rather than the sum.
+    Weights are memory-mapped from the safetensors shards. Called like the
+    diffusers pipeline; stage timings and peak RSS of the last call are kept
+    in last_stages, and on_loaded is called once the transformer is loaded
+    and denoising is about to start.
+    """
+
+    def __init__(self, text_dir: Path, model_dir: Path, lora_path, torch_dtype, options: dict):
+        self.text_dir = text_dir
+        self.model_dir = model_dir
+        # None once the LoRA is fused into model_dir
+        self.lora_path = lora_path
+        self.torch_dtype = torch_dtype
+        self.options = options
+        self.last_stages = {}
+        self._encode_stage = None
+
+    def _load(self, path: Path, **components):
+        from diffusers import DiffusionPipeline
+        import torch
+
+        # Weights loaded inside the callers' inference_mode would be read-only inference tensors
+        with torch.inference_mode(False):
+            return DiffusionPipeline.from_pretrained(
+                str(path), torch_dtype=self.torch_dtype, **LOW_MEMORY_LOAD, **components
+            )
+
+    def _stage(self, start: float) -> dict:
+        return {"seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+
+    def encode_prompt(self, prompt, device=None, num_images_per_prompt: int = 1):
+        """Load the text encoder, encode the prompts and free it again"""
+        start = time.perf_counter()
+        pipe = self._load(self.text_dir, transformer=None, vae=None)
+        embeddings = pipe.encode_prompt(prompt=prompt, device="cpu", num_images_per_prompt=num_images_per_prompt)
+        del pipe
+        gc.collect()
+        self._encode_stage = self._stage(start)
+        return embeddings
+
+    def __call__(self, prompt=None, prompt_embeds=None, prompt_embeds_mask=None,
+                 num_images_per_prompt: int = 1, on_loaded=None, **kwargs):
+        import torch
+
+        if prompt_embeds is None:
+            # Embeddings are repeated per image by the denoising call, so encode each prompt once
+            prompt_embeds, prompt_embeds_mask = self.encode_prompt(prompt)
+        # Prompts encoded ahead of the call (see encode_prompts) count towards this call
+        self.last_stages = {"encode": self._encode_stage} if self._encode_stage else {}
+        self._encode_stage = None
+
+        start = time.perf_counter()
+        pipe = self._load(self.model_dir, text_encoder=None, tokenizer=None)
+        if self.lora_path is not None:
+            with torch.inference_mode(False):
+                pipe.load_lora_weights(str(self.lora_path))
+        optimize_pipeline(pipe, torch, **self.options)
+        self.last_stages["load_transformer"] = self._stage(start)
+        if on_loaded is not None:
+            on_loaded()
+
+        start = time.perf_counter()
+        result = pipe(
+            prompt_embeds=prompt_embeds,
+            prompt_embeds_mask=prompt_embeds_mask,
+            num_images_per_prompt=num_images_per_prompt,
+            **kwargs,
+        )
+        del pipe
+        gc.collect()
+        self.last_stages["denoise_and_decode"] = self._stage(start)
+        return result
+
+def load_pipeline(base_dir: str, lora_path: str, device: str = "auto", dtype: str = "auto",
+                  fused_dir=None, threads=None, channels_last: bool = False, torch_compile: bool = False,
+                  attention_slicing: bool = False, vae_tiling: bool = False, low_memory: bool = False):
+    """Load the base pipeline and Lightning LoRA; returns (pipe, device)
+
+    With fused_dir the LoRA is fused into the base weights on first use and
+    the fused model is loaded directly afterwards; it is re-fused when the
+    LoRA or the dtype changes. With low_memory the
+    pipeline is a StagedPipeline on CPU (nothing is loaded until the first
+    call); on CUDA, components stay in CPU RAM and move to the GPU only while
+    they run.
+    """
     try:
         from diffusers import DiffusionPipeline
         import torch
     except Exception:
-        _eprint("diffusers/torch is not installed. Run: pip install diffusers transformers accelerate safetensors torch")
-        sys.exit(1)
+        raise LogoError("diffusers/torch is not installed. Run: pip install diffusers transformers accelerate safetensors torch", 1)
 
-    device = (
-        "cuda" if (args.device == "auto" and _has_cuda()) else (args.device if args.device != "auto" else "cpu")
-    )
+    device = resolve_device(device)
+    if threads:
+        torch.set_num_threads(int(threads))
+
+    base_dir = Path(base_dir)
+    lora_path = Path(lora_path)
+    fused_dir = Path(fused_dir) if fused_dir else None
+    torch_dtype = resolve_dtype(torch, dtype, device)
+    use_fused = fused_dir is not None and _fused_is_current(fused_dir, lora_path, torch_dtype)
+    if not use_fused:
+        if not base_dir.exists():
+            raise LogoError(f"Base model not found: {base_dir}. Download with huggingface-cli or set --base_dir.", 2)
+        if not lora_path.exists():
+            raise LogoError(f"Lightning LoRA not found: {lora_path}. Download with huggingface-cli or set --lora_path.", 3)
+
+    options = {
+        "channels_last": channels_last,
+        "torch_compile": torch_compile,
+        "attention_slicing": attention_slicing,
+        "vae_tiling": vae_tiling,
+    }
+    try:
+        if fused_dir is not None and not use_fused:
+            fuse_lora(base_dir, lora_path, fused_dir, torch_dtype)
+            use_fused = True
+        model_dir = fused_dir if use_fused else base_dir
+        if low_memory and device == "cpu":
+            # The LoRA only touches the transformer, so the text encoder always comes from the base model
+            text_dir = base_dir if base_dir.exists() else model_dir
+            return StagedPipeline(text_dir, model_dir, None if use_fused else lora_path, torch_dtype, options), device
+
+        load_options = LOW_MEMORY_LOAD if low_memory else {}
+        pipe = DiffusionPipeline.from_pretrained(str(model_dir), torch_dtype=torch_dtype, **load_options)
+        if low_memory:
+            pipe.enable_model_cpu_offload()
+        else:
+            pipe = pipe.to(device)
+        if not use_fused:
+            pipe.load_lora_weights(str(lora_path))
+        optimize_pipeline(pipe, torch, **options)
+    except Exception as e:
+        raise LogoError(f"Failed to load pipeline: {e}", 4)
+
+    return pipe, device
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser) -> None:
+    """Model and performance flags shared by the CLI, worker and benchmark"""
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--base_dir", default=DEFAULT_BASE_DIR)
+    parser.add_argument("--lora_path", default=DEFAULT_LORA_PATH)
+    parser.add_argument("--dtype", default="auto", choices=["auto", "float32", "bfloat16", "float16"])
+    parser.add_argument("--fused_dir", default=None, help="Fuse the LoRA once, save it here and load it from here")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op CPU threads")
+    parser.add_argument("--channels-last", action="store_true", help="channels-last memory format for conv modules")
+    parser.add_argument("--compile", action="store_true", help="torch.compile the denoiser (slow first call)")
+    parser.add_argument("--attention-slicing", action="store_true", help="Lower peak memory at some speed cost")
+    parser.add_argument("--vae-tiling", action="store_true", help="Decode large images tile by tile")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Memory-mapped weights; on CPU load text encoder and transformer one at a time")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Prompt-embedding and image cache")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the cache")
+    parser.add_argument("--cpu-optimize", action="store_true",
+                        help=f"CPU preset: fused LoRA (default {DEFAULT_FUSED_DIR}), bf16 where supported, channels-last")
+
+def pipeline_options(args) -> dict:
+    """load_pipeline keyword arguments from parsed flags, with the --cpu-optimize preset applied"""
+    preset = args.cpu_optimize
+    return {
+        "base_dir": args.base_dir,
+        "lora_path": args.lora_path,
+        "device": args.device,
+        "dtype": "cpu-auto" if preset and args.dtype == "auto" else args.dtype,
+        "fused_dir": args.fused_dir or (DEFAULT_FUSED_DIR if preset else None),
+        "threads": args.threads,
+        "channels_last": args.channels_last or preset,
+        "torch_compile": args.compile,
+        "attention_slicing": args.attention_slicing,
+        "vae_tiling": args.vae_tiling,
+        "low_memory": args.low_memory,
+    }
+
+def model_fingerprint(options: dict, device: str) -> dict:
+    """Identity of the weights and settings that determine generated images
+
+    The dtype is the resolved torch dtype, since "auto" means float16 on CUDA
+    but float32 on CPU.
+    """
+    base = path_fingerprint(options["base_dir"])
+    fused = path_fingerprint(options.get("fused_dir"))
+    dtype = options.get("dtype")
+    try:
+        import torch
+        dtype = str(resolve_dtype(torch, dtype, device))
+    except ImportError:
+        pass
+    return {
+        "text_encoder": base or fused,
+        "base": base,
+        "fused": fused,
+        "lora": path_fingerprint(options["lora_path"]),
+        "dtype": dtype,
+        "device": device,
+    }
+
+def make_cache(args, device: str):
+    """LogoCache for the parsed flags, or None with --no-cache"""
+    if args.no_cache:
+        return None
+    return LogoCache(model_fingerprint(pipeline_options(args), device), args.cache_dir)
+
+def image_key(cache, prompt: str, seed, steps, cfg, height, width) -> str:
+    """Image cache key of one seeded generation"""
+    return cache.image_key(prompt=prompt, seed=int(seed), steps=int(steps), cfg=float(cfg),
+                           height=int(height), width=int(width))
 
-    base_dir = Path(args.base_dir)
-    lora_path = Path(args.lora_path)
-    if not base_dir.exists():
-        _eprint(f"Base model not found: {base_dir}. Download with huggingface-cli or set --base_dir.")
-        sys.exit(2)
-    if not lora_path.exists():
-        _eprint(f"Lightning LoRA not found: {lora_path}. Download with huggingface-cli or set --lora_path.")
-        sys.exit(3)
+def _pad_stack(tensors: list):
+    import torch
 
-    dtype = torch.float16 if device == "cuda" else torch.float32
+    length = max(tensor.shape[0] for tensor in tensors)
+    return torch.stack([
+        torch.cat([tensor, tensor.new_zeros((length - tensor.shape[0], *tensor.shape[1:]))])
+        for tensor in tensors
+    ])
 
+def encode_prompts(pipe, prompts: list, cache=None):
+    """Prompt embeddings for a list of prompts, encoding only those not cached
+
+    Returns (prompt_embeds, prompt_embeds_mask) padded to a common length,
+    or None when the pipeline has no encode_prompt (then it encodes itself).
+    """
+    if not hasattr(pipe, "encode_prompt"):
+        return None
+    entries = {prompt: cache.get_embedding(prompt) if cache else None for prompt in dict.fromkeys(prompts)}
+    missing = [prompt for prompt, entry in entries.items() if entry is None]
+    if missing:
+        prompt_embeds, prompt_embeds_mask = pipe.encode_prompt(prompt=missing, num_images_per_prompt=1)
+        for row, prompt in enumerate(missing):
+            # Trim the batch padding so each prompt is stored at its own length
+            length = int(prompt_embeds_mask[row].sum()) if prompt_embeds_mask is not None else prompt_embeds.shape[1]
+            embeds = prompt_embeds[row, :length]
+            mask = prompt_embeds_mask[row, :length] if prompt_embeds_mask is not None else None
+            if cache:
+                cache.put_embedding(prompt, embeds, mask)
+            entries[prompt] = (embeds.cpu(), mask.cpu() if mask is not None else None)
+
+    device = getattr(pipe, "_execution_device", None)
+    # Embeddings computed under another dtype must match the transformer's weights
+    dtype = getattr(getattr(pipe, "transformer", None), "dtype", None) or getattr(pipe, "torch_dtype", None)
+    embeds = _pad_stack([entries[prompt][0] for prompt in prompts])
+    masks = [entries[prompt][1] for prompt in prompts]
+    mask = _pad_stack(masks) if all(m is not None for m in masks) else None
+    if dtype is not None:
+        embeds = embeds.to(dtype=dtype)
+    if device is not None:
+        embeds = embeds.to(device)
+        mask = mask.to(device) if mask is not None else None
+    return embeds, mask
+
+def _emit(on_event, event: dict) -> None:
+    if on_event is not None:
+        on_event(event)
+
+def _synchronize(tensor) -> None:
+    # CUDA kernels run asynchronously; wait for them so step times are real
+    if getattr(tensor, "is_cuda", False):
+        import torch
+        torch.cuda.synchronize()
+
+class LatentPreview:
+    """Decodes intermediate latents with a tiny autoencoder into a small PNG
+
+    The decoder (e.g. diffusers AutoencoderTiny) must match the Qwen-Image
+    VAE latent space; it is cheap enough to run every few steps. The preview
+    file is replaced atomically, so readers never see a partial image.
+    """
+
+    def __init__(self, decoder, path: Path, height: int, width: int, every: int = 1):
+        self.decoder = decoder
+        self.path = path
+        self.height = int(height)
+        self.width = int(width)
+        self.every = max(1, int(every))
+
+    def write(self, pipe, latents, step: int, steps: int):
+        """Write the preview for a finished step; returns its path or None if skipped"""
+        import torch
+
+        if step % self.every and step != steps:
+            return None
+        # Undo the Qwen-Image packing and normalization like the pipeline does before its VAE decode
+        latents = pipe._unpack_latents(latents[:1], self.height, self.width, pipe.vae_scale_factor)
+        config = pipe.vae.config
+        mean = torch.tensor(config.latents_mean).view(1, config.z_dim, 1, 1, 1).to(latents.device, latents.dtype)
+        std = torch.tensor(config.latents_std).view(1, config.z_dim, 1, 1, 1).to(latents.device, latents.dtype)
+        latents = (latents * std + mean)[:, :, 0]
+        image = self.decoder.decode(latents.to(self.decoder.device, self.decoder.dtype)).sample
+        image = pipe.image_processor.postprocess(image, output_type="pil")[0]
+        image.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}")
+        image.save(str(tmp_path), format="PNG")
+        os.replace(tmp_path, self.path)
+        return str(self.path)
+
+def load_preview_decoder(path: str, device: str, dtype: str = "auto"):
+    """Load a tiny autoencoder (diffusers AutoencoderTiny) for latent previews"""
+    try:
+        from diffusers import AutoencoderTiny
+        import torch
+    except Exception:
+        raise LogoError("diffusers/torch is not installed. Run: pip install diffusers transformers accelerate safetensors torch", 1)
     try:
-        pipe = DiffusionPipeline.from_pretrained(str(base_dir), torch_dtype=dtype)
-        pipe = pipe.to(device)
-        pipe.load_lora_weights(str(lora_path))
+        decoder = AutoencoderTiny.from_pretrained(path, torch_dtype=resolve_dtype(torch, dtype, device))
+        return decoder.to(device)
     except Exception as e:
-        _eprint(f"Failed to load pipeline: {e}")
-        sys.exit(4)
+        raise LogoError(f"Failed to load preview decoder: {e}", 4)
 
-    prompt = args.prompt or build_prompt(args.company, args.colors, args.style, args.industry)
+class StepTimer:
+    """callback_on_step_end hook: per-step timings, step events and previews"""
+
+    def __init__(self, steps: int, on_event=None, preview=None, **details):
+        self.steps = int(steps)
+        self.on_event = on_event
+        self.preview = preview
+        # Extra fields for every step event, e.g. the batch number
+        self.details = details
+        self.step_seconds = []
+        self._last = None
+
+    def start(self) -> None:
+        self._last = time.perf_counter()
+
+    def __call__(self, pipe, step_index: int, timestep, callback_kwargs: dict) -> dict:
+        latents = callback_kwargs.get("latents")
+        _synchronize(latents)
+        seconds = time.perf_counter() - self._last
+        self.step_seconds.append(seconds)
+        event = {"event": "step", **self.details, "step": step_index + 1, "steps": self.steps, "seconds": seconds}
+        if self.preview is not None and latents is not None:
+            start = time.perf_counter()
+            preview = self.preview.write(pipe, latents, step_index + 1, self.steps)
+            if preview:
+                event.update({"preview": preview, "preview_seconds": time.perf_counter() - start})
+        _emit(self.on_event, event)
+        # Preview time is reported separately, not as part of the next step
+        self._last = time.perf_counter()
+        return callback_kwargs
+
+    def finish(self) -> float:
+        """Seconds since the last step: VAE decode and postprocessing"""
+        return time.perf_counter() - self._last
+
+def _run_pipeline(pipe, prompt, cache=None, steps: int = 4, on_event=None, preview=None, details=None, **kwargs):
+    """Call the pipeline with step instrumentation; returns (result, timings)
+
+    Prompts are encoded up front (from the cache where possible) so encode,
+    per-step denoise and decode times are reported separately. A
+    StagedPipeline's transformer load is reported as its own stage rather
+    than as part of the first step.
+    """
+    import torch
+
+    details = details or {}
+    timings = {}
+    timer = StepTimer(steps, on_event, preview, **details)
+    with torch.inference_mode():
+        start = time.perf_counter()
+        embeddings = encode_prompts(pipe, prompt if isinstance(prompt, list) else [prompt], cache)
+        if embeddings is None:
+            inputs = {"prompt": prompt}
+        else:
+            _synchronize(embeddings[0])
+            timings["encode"] = time.perf_counter() - start
+            _emit(on_event, {"event": "encode", **details, "seconds": timings["encode"]})
+            inputs = {"prompt_embeds": embeddings[0], "prompt_embeds_mask": embeddings[1]}
 
+        call_options = {}
+        if isinstance(pipe, StagedPipeline):
+            def on_loaded():
+                timings["load_transformer"] = pipe.last_stages["load_transformer"]["seconds"]
+                _emit(on_event, {"event": "load_transformer", **details, "seconds": timings["load_transformer"]})
+                timer.start()
+            call_options["on_loaded"] = on_loaded
+
+        timer.start()
+        result = pipe(
+            **inputs,
+            **call_options,
+            num_inference_steps=int(steps),
+            callback_on_step_end=timer,
+            callback_on_step_end_tensor_inputs=["latents"],
+            **kwargs,
+        )
+    timings["steps"] = timer.step_seconds
+    timings["denoise"] = sum(timer.step_seconds)
+    timings["decode"] = timer.finish()
+    _emit(on_event, {"event": "decode", **details, "seconds": timings["decode"]})
+    return result, timings
+
+def generate_logo(pipe, company: str, colors: str = "#00897b,#00acc1", style: str = "minimalist",
+                  industry: str = "cleaning", prompt=None, seed=None, steps: int = 4, cfg: float = 1.0,
+                  height: int = 1024, width: int = 1024, output=None, cache=None,
+                  on_event=None, preview=None) -> dict:
+    """Generate and save one logo with a loaded pipeline
+
+    Returns the output path, prompt, seed, whether the image came from the
+    cache and per-stage timings in seconds (encode, per-step denoise, decode,
+    save). on_event receives progress events as dicts; preview is an
+    optional LatentPreview written after denoising steps.
+    """
+    import torch
+
+    prompt = prompt or build_prompt(company, colors, style, industry)
+    generator = torch.Generator(device="cpu").manual_seed(int(seed)) if seed is not None else None
+    out_path = output_path(company, output)
+    timings = {}
+
+    key = None
+    if cache and seed is not None:
+        key = image_key(cache, prompt, seed, steps, cfg, height, width)
+        start = time.perf_counter()
+        if cache.get_image(key, out_path):
+            timings["cache"] = time.perf_counter() - start
+            _emit(on_event, {"event": "save", "output": str(out_path), "cached": True, "seconds": timings["cache"]})
+            return {"output": str(out_path), "prompt": prompt, "seed": seed, "cached": True, "timings": timings}
+
+    start = time.perf_counter()
     try:
-        image = pipe(
-            prompt=prompt,
-            num_inference_steps=int(args.steps),
-            guidance_scale=float(args.cfg),
-            height=int(args.height),
-            width=int(args.width),
-        ).images[0]
+        result, stages = _run_pipeline(
+            pipe, prompt, cache,
+            steps=steps,
+            on_event=on_event,
+            preview=preview,
+            guidance_scale=float(cfg),
+            height=int(height),
+            width=int(width),
+            generator=generator,
+        )
+        image = result.images[0]
     except Exception as e:
-        _eprint(f"Generation failed: {e}")
-        sys.exit(5)
+        raise LogoError(f"Generation failed: {e}", 5)
+    timings["generate"] = time.perf_counter() - start
+    timings.update(stages)
 
-    out_name = args.output or f"{args.company.lower().replace(' ', '-')}-logo.png"
-    out_path = Path.cwd() / "client" / "public" / out_name
     out_path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
     try:
         image.save(str(out_path))
-        print(f"✅ Logo saved: {out_path}")
+        if key:
+            cache.put_image(key, image)
+    except Exception as e:
+        raise LogoError(f"Saving failed: {e}", 6)
+    timings["save"] = time.perf_counter() - start
+    _emit(on_event, {"event": "save", "output": str(out_path), "cached": False, "seconds": timings["save"]})
+
+    return {"output": str(out_path), "prompt": prompt, "seed": seed, "cached": False, "timings": timings}
+
+def generate_variants(pipe, company: str, industry: str = "cleaning", styles=("minimalist",),
+                      palettes=("#00897b,#00acc1",), seeds=(0,), steps: int = 4, cfg: float = 1.0,
+                      height: int = 1024, width: int = 1024, max_batch: int = DEFAULT_MAX_BATCH,
+                      prefix=None, cache=None, on_event=None) -> dict:
+    """Generate every style × palette variant for every seed and write a manifest
+
+    Prompts share pipeline calls through num_images_per_prompt with one
+    seeded Generator per image, up to max_batch images per call. A call whose
+    images are all cached is skipped (those images have batch 0). Returns the
+    manifest (also saved as <prefix>-manifest.json next to the images), with
+    encode/step/decode timings per call under "batches".
+    """
+    import torch
+
+    prefix = prefix or f"{_slug(company)}-logo"
+    seeds = [int(s) for s in seeds]
+    variants = [
+        {"style": style, "colors": colors, "prompt": build_prompt(company, colors, style, industry)}
+        for style in styles
+        for colors in palettes
+    ]
+    for number, variant in enumerate(variants, 1):
+        variant["variant"] = number
+
+    images = []
+    batches = []
+    calls = 0
+    total_start = time.perf_counter()
+    for seed_chunk in _chunks(seeds, max(1, max_batch)):
+        prompts_per_call = max(1, max_batch // len(seed_chunk))
+        for chunk in _chunks(variants, prompts_per_call):
+            # Diffusers orders outputs prompt-major; generators, keys and paths follow the same order
+            pairs = [(variant, seed) for variant in chunk for seed in seed_chunk]
+            out_paths = [output_path(company, f"{prefix}-v{variant['variant']}-s{seed}.png") for variant, seed in pairs]
+            keys = [
+                image_key(cache, variant["prompt"], seed, steps, cfg, height, width) for variant, seed in pairs
+            ] if cache else []
+
+            if keys and all(cache.has_image(key) for key in keys):
+                for (variant, seed), key, out_path in zip(pairs, keys, out_paths):
+                    start = time.perf_counter()
+                    if not cache.get_image(key, out_path):
+                        raise LogoError(f"Cached image disappeared: {key}", 6)
+                    images.append({
+                        "output": str(out_path),
+                        "seed": seed,
+                        **variant,
+                        "batch": 0,
+                        "batch_seconds": 0.0,
+                        "seconds": time.perf_counter() - start,
+                        "cached": True,
+                    })
+                    _emit(on_event, {"event": "save", "output": str(out_path), "cached": True,
+                                     "seconds": images[-1]["seconds"]})
+                continue
+
+            generators = [torch.Generator(device="cpu").manual_seed(seed) for _, seed in pairs]
+            start = time.perf_counter()
+            try:
+                result, stages = _run_pipeline(
+                    pipe, [variant["prompt"] for variant in chunk], cache,
+                    steps=steps,
+                    on_event=on_event,
+                    details={"batch": calls + 1},
+                    num_images_per_prompt=len(seed_chunk),
+                    guidance_scale=float(cfg),
+                    height=int(height),
+                    width=int(width),
+                    generator=generators,
+                )
+            except Exception as e:
+                raise LogoError(f"Generation failed: {e}", 5)
+            batch_seconds = time.perf_counter() - start
+            calls += 1
+            batches.append({"batch": calls, "images": len(result.images), "seconds": batch_seconds, **stages})
+
+            for index, image in enumerate(result.images):
+                variant, seed = pairs[index]
+                out_path = out_paths[index]
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                start = time.perf_counter()
+                try:
+                    image.save(str(out_path))
+                    if keys:
+                        cache.put_image(keys[index], image)
+                except Exception as e:
+                    raise LogoError(f"Saving failed: {e}", 6)
+                images.append({
+                    "output": str(out_path),
+                    "seed": seed,
+                    **variant,
+                    "batch": calls,
+                    "batch_seconds": batch_seconds,
+                    "seconds": batch_seconds / len(result.images) + (time.perf_counter() - start),
+                    "cached": False,
+                })
+                _emit(on_event, {"event": "save", "output": str(out_path), "cached": False,
+                                 "seconds": time.perf_counter() - start})
+
+    manifest = {
+        "company": company,
+        "industry": industry,
+        "steps": int(steps),
+        "cfg": float(cfg),
+        "height": int(height),
+        "width": int(width),
+        "calls": calls,
+        "total_seconds": time.perf_counter() - total_start,
+        "batches": batches,
+        "images": images,
+    }
+    manifest_path = output_path(company, f"{prefix}-manifest.json")
+    try:
+        tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, manifest_path)
     except Exception as e:
-        _eprint(f"Saving failed: {e}")
-        sys.exit(6)
+        raise LogoError(f"Saving failed: {e}", 6)
+    manifest["manifest"] = str(manifest_path)
+    return manifest
+
+def _write_report(path, report: dict, pipe=None, cache=None) -> None:
+    if not path:
+        return
+    report["peak_rss_mb"] = peak_rss_mb()
+    if cache is not None:
+        report["cache"] = cache.stats()
+    if getattr(pipe, "last_stages", None):
+        # Per-stage figures of the last call with --low-memory on CPU
+        report["stages"] = pipe.last_stages
+    Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+def _print_event(event: dict) -> None:
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(prog="generate_logo", add_help=True)
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--colors", default="#00897b,#00acc1")
+    parser.add_argument("--style", default="minimalist")
+    parser.add_argument("--industry", default="cleaning")
+    parser.add_argument("--prompt", default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--cfg", type=float, default=1.0)
+    parser.add_argument("--height", type=int, default=1024)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--report", default=None, help="Write timings and peak RSS as JSON to this file")
+    parser.add_argument("--events", action="store_true",
+                        help="Print progress as JSON lines on stdout (load, encode, load_transformer, step, decode, save, done)")
+    parser.add_argument("--preview-vae", default=None,
+                        help="Tiny autoencoder (AutoencoderTiny) for latent previews, written as <output>-preview.png")
+    parser.add_argument("--preview-every", type=int, default=1, help="Write a preview every N steps")
+    add_pipeline_arguments(parser)
+    # Batch mode: any of these generates variants plus a manifest
+    parser.add_argument("--seeds", default=None, help="Comma-separated seeds, one image each per variant")
+    parser.add_argument("--num-images", type=int, default=None, help="Consecutive seeds starting at --seed")
+    parser.add_argument("--styles", default=None, help="Comma-separated styles to sweep")
+    parser.add_argument("--palettes", nargs="+", default=None, help="Color lists to sweep, e.g. '#00897b,#00acc1'")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Images per pipeline call")
+
+    args = parser.parse_args()
+    batch_mode = any(v is not None for v in (args.seeds, args.num_images, args.styles, args.palettes))
+
+    # With --events stdout carries only JSON lines; human-readable messages go to stderr
+    on_event = _print_event if args.events else None
+    say = _eprint if args.events else print
+
+    report = {"settings": pipeline_options(args)}
+    cache = make_cache(args, resolve_device(args.device))
+    prompt = args.prompt or build_prompt(args.company, args.colors, args.style, args.industry)
+    # A single seeded logo that is already cached needs no model at all
+    cached = (not batch_mode and cache is not None and args.seed is not None
+              and cache.has_image(image_key(cache, prompt, args.seed, args.steps, args.cfg, args.height, args.width)))
+    try:
+        start = time.perf_counter()
+        pipe, device = (None, None) if cached else load_pipeline(**pipeline_options(args))
+        load_seconds = time.perf_counter() - start
+        if pipe is not None:
+            _emit(on_event, {"event": "load", "seconds": load_seconds, "device": device})
+        if batch_mode:
+            manifest = generate_variants(
+                pipe, args.company, args.industry,
+                styles=[s.strip() for s in args.styles.split(",")] if args.styles else [args.style],
+                palettes=args.palettes or [args.colors],
+                seeds=parse_seeds(args.seeds, args.num_images or 1, args.seed),
+                steps=args.steps, cfg=args.cfg, height=args.height, width=args.width,
+                max_batch=args.max_batch, prefix=Path(args.output).stem if args.output else None,
+                cache=cache, on_event=on_event,
+            )
+            _emit(on_event, {"event": "done", "manifest": manifest["manifest"], "images": len(manifest["images"]),
+                             "seconds": manifest["total_seconds"]})
+            say(f"✅ {len(manifest['images'])} logos saved in {manifest['total_seconds']:.1f}s: {manifest['manifest']}")
+            per_image = [image["seconds"] for image in manifest["images"]]
+            first_batch = [image["seconds"] for image in manifest["images"] if image["batch"] == 1] or per_image
+            # Later calls show steady-state speed (the first pays warm-up and compilation)
+            steady = [image["seconds"] for image in manifest["images"] if image["batch"] > 1] or per_image
+            report.update({
+                "images": len(per_image),
+                "calls": manifest["calls"],
+                "first_call_seconds_per_image": sum(first_batch) / len(first_batch),
+                "seconds_per_image": sum(steady) / len(steady),
+                "timings": {"load": load_seconds, "generate_and_save": manifest["total_seconds"]},
+                "batches": manifest["batches"],
+            })
+            _write_report(args.report, report, pipe, cache)
+            return
+
+        preview = None
+        if args.preview_vae and pipe is not None:
+            start = time.perf_counter()
+            decoder = load_preview_decoder(args.preview_vae, device, pipeline_options(args)["dtype"])
+            out_path = output_path(args.company, args.output)
+            preview = LatentPreview(decoder, out_path.with_name(f"{out_path.stem}-preview.png"),
+                                    args.height, args.width, args.preview_every)
+            load_seconds += time.perf_counter() - start
+        result = generate_logo(
+            pipe, args.company, args.colors, args.style, args.industry,
+            prompt=prompt, seed=args.seed, steps=args.steps, cfg=args.cfg,
+            height=args.height, width=args.width, output=args.output, cache=cache,
+            on_event=on_event, preview=preview,
+        )
+    except LogoError as e:
+        _emit(on_event, {"event": "error", "error": str(e), "exit_code": e.exit_code})
+        _eprint(str(e))
+        sys.exit(e.exit_code)
+
+    _emit(on_event, {"event": "done", "output": result["output"], "cached": result["cached"],
+                     "timings": {"load": load_seconds, **result["timings"]}})
+    say(f"✅ Logo saved{' (cached)' if result['cached'] else ''}: {result['output']}")
+    seconds = result["timings"].get("generate", result["timings"].get("cache"))
+    report.update({
+        "images": 1,
+        "calls": 0 if result["cached"] else 1,
+        "first_call_seconds_per_image": seconds,
+        "seconds_per_image": seconds,
+        "timings": {"load": load_seconds, **result["timings"]},
+    })
+    _write_report(args.report, report, pipe, cache)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
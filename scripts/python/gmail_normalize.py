@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Gmail Normalization
+
+Converts Gmail API message resources into the extractor's email records.
+Headers are read in a single pass, and Date headers are parsed with the
+RFC 2822 parser (falling back to dateutil) behind a memoized cache.
+"""
+
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+from dateutil import parser as dateutil_parser
+from dateutil.tz import tzoffset
+
+# Headers copied into email records, in lowercase
+WANTED_HEADERS = frozenset(['subject', 'from', 'date'])
+DATE_CACHE_SIZE = 65536
+SNIPPET_MAX_LENGTH = 200
+
+# Zone abbreviations seen in real Date headers that the RFC 2822 parser doesn't know
+TIMEZONE_ABBREVIATIONS = {
+    'CET': tzoffset('CET', 3600),
+    'CEST': tzoffset('CEST', 7200),
+    'BST': tzoffset('BST', 3600),
+    'IST': tzoffset('IST', 19800),
+    'EET': tzoffset('EET', 7200),
+    'EEST': tzoffset('EEST', 10800),
+    'WET': tzoffset('WET', 0),
+    'WEST': tzoffset('WEST', 3600),
+}
+
+# "GMT+1" / "UTC-05:30" mean east/west of UTC in mail headers; dateutil reads them
+# POSIX-style with the sign flipped, so they are rewritten as numeric offsets first
+GMT_OFFSET_PATTERN = re.compile(r'\b(?:GMT|UTC)\s*([+-])(\d{1,2})(?::?(\d{2}))?\b', re.IGNORECASE)
+# Two defaults that differ in every date field; a field that comes out different
+# under each was filled in from the default rather than parsed
+DATE_DEFAULTS = (datetime(2000, 1, 1), datetime(2001, 2, 2))
+
+def _numeric_offset(match) -> str:
+    sign, hours, minutes = match.groups()
+    return f"{sign}{int(hours):02d}{minutes or '00'}"
+
+def _parse_fallback(value: str) -> Optional[datetime]:
+    """dateutil parse that only accepts values with an explicit year, month and day"""
+    value = GMT_OFFSET_PATTERN.sub(_numeric_offset, value)
+    try:
+        first, second = (
+            dateutil_parser.parse(value, fuzzy=True, default=default, tzinfos=TIMEZONE_ABBREVIATIONS)
+            for default in DATE_DEFAULTS
+        )
+    except (ValueError, OverflowError):
+        return None
+    if first.date() != second.date():
+        return None
+    return first
+
+def header_lookup(headers: List[Dict[str, str]]) -> Dict[str, str]:
+    """Collect the wanted headers in one pass; the first occurrence wins"""
+    found: Dict[str, str] = {}
+    for header in headers:
+        name = header['name'].lower()
+        if name in WANTED_HEADERS and name not in found:
+            found[name] = header['value']
+    return found
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_email_date(value: str) -> Optional[str]:
+    """Parse a Date header into an ISO 8601 string, or None if it is unparseable
+
+    Handles RFC 2822 variants such as missing weekdays, comment suffixes like
+    "(UTC)", named zones and GMT+N offsets. Values without a full date are
+    rejected rather than completed from today's date, so callers can fall
+    back to internalDate. Timestamps without a usable zone are taken as UTC.
+    """
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        parsed = None
+
+    if parsed is None or parsed.tzinfo is None:
+        # Unknown zone names (e.g. CET), GMT+N offsets or layouts outside RFC 2822
+        parsed = _parse_fallback(value) or parsed
+        if parsed is None:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.isoformat()
+
+def internal_date(msg_detail: Dict[str, Any]) -> Optional[str]:
+    """Gmail's receive timestamp (internalDate, epoch milliseconds) as ISO 8601"""
+    value = msg_detail.get('internalDate')
+    if not value:
+        return None
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc).isoformat()
+
+def normalize_email(message_id: str, msg_detail: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Gmail message resource into an output email record
+
+    The date comes from the Date header, then from internalDate; it is left
+    empty rather than invented when neither is usable.
+    """
+    headers = header_lookup(msg_detail['payload'].get('headers', []))
+    date = headers.get('date')
+
+    iso_date = (parse_email_date(date.strip()) if date else None) or internal_date(msg_detail) or ''
+
+    return {
+        'id': message_id,
+        'subject': headers.get('subject', 'No Subject'),
+        'sender': headers.get('from', 'Unknown'),
+        'date': iso_date,
+        'snippet': msg_detail.get('snippet', '')[:SNIPPET_MAX_LENGTH],
+        'thread_id': msg_detail.get('threadId', ''),
+        'labels': msg_detail.get('labelIds', [])
+    }
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Google Data Store
+
+SQLite-backed local store for records produced by GoogleDataExtractor, so
+repeated questions about mail and calendar data don't re-hit the Google APIs.
+Usage: python google_data_store.py emails --sender peter@example.com --days 7
+       python google_data_store.py search "tilbud badeværelse"
+       python google_data_store.py events --start 2024-03-01T00:00 --end 2024-03-02T00:00
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from email.utils import parseaddr
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+DEFAULT_STORE_FILE = 'google_data.sqlite'
+UPSERT_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    subject TEXT,
+    sender TEXT,
+    sender_email TEXT,
+    date TEXT,
+    date_utc TEXT,
+    snippet TEXT,
+    labels TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_emails_thread_id ON emails (thread_id);
+CREATE INDEX IF NOT EXISTS idx_emails_date_utc ON emails (date_utc);
+CREATE INDEX IF NOT EXISTS idx_emails_sender_email ON emails (sender_email, date_utc);
+
+CREATE TABLE IF NOT EXISTS calendar_events (
+    id TEXT PRIMARY KEY,
+    summary TEXT,
+    description TEXT,
+    start TEXT,
+    end TEXT,
+    start_utc TEXT,
+    end_utc TEXT,
+    location TEXT,
+    attendees TEXT,
+    creator TEXT,
+    status TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calendar_events_start_utc ON calendar_events (start_utc);
+"""
+
+# External-content FTS5 index kept in sync with the emails table by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+    subject, snippet, content='emails', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS emails_fts_insert AFTER INSERT ON emails BEGIN
+    INSERT INTO emails_fts (rowid, subject, snippet) VALUES (new.rowid, new.subject, new.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_fts_delete AFTER DELETE ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, snippet)
+    VALUES ('delete', old.rowid, old.subject, old.snippet);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_fts_update AFTER UPDATE ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, snippet)
+    VALUES ('delete', old.rowid, old.subject, old.snippet);
+    INSERT INTO emails_fts (rowid, subject, snippet) VALUES (new.rowid, new.subject, new.snippet);
+END;
+"""
+
+def to_utc(value: Optional[str]) -> Optional[str]:
+    """Normalize an ISO timestamp to a sortable UTC string (naive values are taken as UTC)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+class GoogleDataStore:
+    """Persistent, indexed store of normalized emails and calendar events"""
+
+    def __init__(self, filename: str = DEFAULT_STORE_FILE):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to LIKE scans
+            self.fts = False
+        self.conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def upsert_emails(self, emails: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update email records keyed by id"""
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                email['id'],
+                email.get('thread_id', ''),
+                email.get('subject', ''),
+                email.get('sender', ''),
+                parseaddr(email.get('sender', ''))[1].lower(),
+                email.get('date', ''),
+                to_utc(email.get('date')),
+                email.get('snippet', ''),
+                json.dumps(email.get('labels', []), ensure_ascii=False),
+                now
+            )
+            for email in emails
+        ]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO emails (id, thread_id, subject, sender, sender_email, date, date_utc,
+                                    snippet, labels, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    thread_id = excluded.thread_id,
+                    subject = excluded.subject,
+                    sender = excluded.sender,
+                    sender_email = excluded.sender_email,
+                    date = excluded.date,
+                    date_utc = excluded.date_utc,
+                    snippet = excluded.snippet,
+                    labels = excluded.labels,
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
+
+    def upsert_events(self, events: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update calendar event records keyed by id"""
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                event['id'],
+                event.get('summary', ''),
+                event.get('description', ''),
+                event.get('start', ''),
+                event.get('end', ''),
+                to_utc(event.get('start')),
+                to_utc(event.get('end')),
+                event.get('location', ''),
+                json.dumps(event.get('attendees', []), ensure_ascii=False),
+                event.get('creator', ''),
+                event.get('status', ''),
+                now
+            )
+            for event in events
+        ]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO calendar_events (id, summary, description, start, end, start_utc, end_utc,
+                                             location, attendees, creator, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    summary = excluded.summary,
+                    description = excluded.description,
+                    start = excluded.start,
+                    end = excluded.end,
+                    start_utc = excluded.start_utc,
+                    end_utc = excluded.end_utc,
+                    location = excluded.location,
+                    attendees = excluded.attendees,
+                    creator = excluded.creator,
+                    status = excluded.status,
+                    updated_at = excluded.updated_at
+            """, rows)
+        return len(rows)
+
+    def delete_emails(self, ids: Iterable[str]) -> None:
+        """Remove emails that were deleted or left the INBOX"""
+        with self.conn:
+            self.conn.executemany("DELETE FROM emails WHERE id = ?", [(i,) for i in ids])
+
+    def delete_events(self, ids: Iterable[str]) -> None:
+        """Remove cancelled calendar events"""
+        with self.conn:
+            self.conn.executemany("DELETE FROM calendar_events WHERE id = ?", [(i,) for i in ids])
+
+    def save_extract(self, data: Dict[str, Any]) -> None:
+        """Apply an extract_all_data/extract_incremental result to the store"""
+        self.upsert_emails(data['emails'])
+        self.upsert_events(data['calendar_events'])
+        deleted = data.get('deleted', {})
+        self.delete_emails(deleted.get('emails', []))
+        self.delete_events(deleted.get('calendar_events', []))
+
+    def upsert_stream(self, kind: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass records through unchanged while upserting them in chunks
+
+        Lets streaming writers (save_to_jsonl) populate the store without
+        materializing the extract. kind is 'emails' or 'calendar_events'.
+        """
+        upsert = self.upsert_emails if kind == 'emails' else self.upsert_events
+        chunk: List[Dict[str, Any]] = []
+        for record in records:
+            chunk.append(record)
+            yield record
+            if len(chunk) >= UPSERT_CHUNK_SIZE:
+                upsert(chunk)
+                chunk = []
+        if chunk:
+            upsert(chunk)
+
+    def _email_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'subject': row['subject'],
+            'sender': row['sender'],
+            'date': row['date'],
+            'snippet': row['snippet'],
+            'thread_id': row['thread_id'],
+            'labels': json.loads(row['labels'] or '[]')
+        }
+
+    def _event_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'summary': row['summary'],
+            'description': row['description'],
+            'start': row['start'],
+            'end': row['end'],
+            'location': row['location'],
+            'attendees': json.loads(row['attendees'] or '[]'),
+            'creator': row['creator'],
+            'status': row['status']
+        }
+
+    def emails_from(self, sender: str, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Emails from a sender, newest first
+
+        An email address is matched exactly via the sender_email index; any
+        other value is matched as a substring of the From header.
+        """
+        if '@' in sender:
+            clauses, params = ['sender_email = ?'], [sender.lower()]
+        else:
+            clauses, params = ['sender LIKE ?'], [f'%{sender}%']
+        if since:
+            clauses.append('date_utc >= ?')
+            params.append(to_utc(since.isoformat()))
+        if until:
+            clauses.append('date_utc < ?')
+            params.append(to_utc(until.isoformat()))
+        rows = self.conn.execute(
+            f"SELECT * FROM emails WHERE {' AND '.join(clauses)} ORDER BY date_utc DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return [self._email_row(row) for row in rows]
+
+    def emails_in_thread(self, thread_id: str) -> List[Dict[str, Any]]:
+        """All stored emails in a thread, oldest first"""
+        rows = self.conn.execute(
+            "SELECT * FROM emails WHERE thread_id = ? ORDER BY date_utc", (thread_id,)
+        ).fetchall()
+        return [self._email_row(row) for row in rows]
+
+    def search_emails(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Full-text search over subject and snippet, best matches first"""
+        if self.fts:
+            sql = """
+                SELECT emails.* FROM emails_fts
+                JOIN emails ON emails.rowid = emails_fts.rowid
+                WHERE emails_fts MATCH ?
+                ORDER BY bm25(emails_fts)
+                LIMIT ?
+            """
+            try:
+                rows = self.conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS5 query syntax (e.g. an email address): match each term literally
+                terms = ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+                rows = self.conn.execute(sql, (terms, limit)).fetchall()
+        else:
+            pattern = f'%{query}%'
+            rows = self.conn.execute(
+                "SELECT * FROM emails WHERE subject LIKE ? OR snippet LIKE ? ORDER BY date_utc DESC LIMIT ?",
+                (pattern, pattern, limit)
+            ).fetchall()
+        return [self._email_row(row) for row in rows]
+
+    def events_overlapping(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Events that overlap the [start, end) window, ordered by start time"""
+        rows = self.conn.execute(
+            "SELECT * FROM calendar_events WHERE start_utc < ? AND end_utc > ? ORDER BY start_utc",
+            (to_utc(end.isoformat()), to_utc(start.isoformat()))
+        ).fetchall()
+        return [self._event_row(row) for row in rows]
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Query the local Google data store')
+    parser.add_argument('--store', default=DEFAULT_STORE_FILE, help='SQLite store file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    emails_parser = subparsers.add_parser('emails', help='Emails from a sender')
+    emails_parser.add_argument('--sender', required=True)
+    emails_parser.add_argument('--days', type=int, default=7, help='Look back this many days (0 = all)')
+    emails_parser.add_argument('--limit', type=int, default=100)
+
+    search_parser = subparsers.add_parser('search', help='Full-text search over subject and snippet')
+    search_parser.add_argument('query')
+    search_parser.add_argument('--limit', type=int, default=50)
+
+    events_parser = subparsers.add_parser('events', help='Events overlapping a time window')
+    events_parser.add_argument('--start', required=True, help='ISO timestamp')
+    events_parser.add_argument('--end', required=True, help='ISO timestamp')
+
+    args = parser.parse_args()
+
+    with GoogleDataStore(args.store) as store:
+        if args.command == 'emails':
+            since = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days else None
+            results = store.emails_from(args.sender, since=since, limit=args.limit)
+        elif args.command == 'search':
+            results = store.search_emails(args.query, limit=args.limit)
+        else:
+            results = store.events_overlapping(
+                datetime.fromisoformat(args.start),
+                datetime.fromisoformat(args.end)
+            )
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Local JSON-over-HTTP Server Helpers
+
+Shared by the long-running workers (extractor_daemon.py, logo_worker.py):
+a request handler base class with JSON request/response helpers and
+request logging, a threaded HTTP server for Unix domain sockets, and the
+listen/serve/cleanup bootstrap for either TCP on 127.0.0.1 or a socket.
+"""
+
+import json
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Type
+
+class JsonRequestHandler(BaseHTTPRequestHandler):
+    """Request handler base class for JSON endpoints; log_prefix tags access log lines"""
+
+    log_prefix = '🔌'
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json_object(self) -> Dict[str, Any]:
+        """The request body as a JSON object ({} when empty); ValueError otherwise"""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        print(f"{self.log_prefix} {self.address_string()} {format % args}")
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix domain socket"""
+    daemon_threads = True
+
+def serve(handler: Type[BaseHTTPRequestHandler], name: str, port: int, socket_path: Optional[str] = None) -> None:
+    """Serve handler on a Unix socket (replacing a stale one) or 127.0.0.1:port until interrupted"""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, handler)
+        print(f"🚀 {name} listening on unix:{socket_path}")
+    else:
+        server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        print(f"🚀 {name} listening on http://127.0.0.1:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Shutting down")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
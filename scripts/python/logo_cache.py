@@ -0,0 +1,195 @@
+"""
+Two-level on-disk cache for logo generation
+
+- Prompt embeddings: text-encoder output per prompt, keyed by a hash of the
+  prompt plus the model fingerprint, resolved dtype and device, so sweeps and repeated
+  requests skip the text encoder.
+- Images: content-addressed PNGs keyed by every generation parameter
+  (prompt, seed, steps, cfg, size) plus the model/LoRA fingerprints, so a
+  logo that was already generated is copied instead of re-denoised.
+
+Model fingerprints are built from file paths, sizes and modification times,
+so replacing a checkpoint or LoRA invalidates its entries. Each level has a
+size budget and evicts least recently used entries beyond it. Only seeded
+requests use the image cache; unseeded ones are random by design.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "logo")
+DEFAULT_EMBEDDINGS_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_IMAGES_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def content_key(data: Dict) -> str:
+    """Stable SHA-256 of a JSON-serializable dict"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def path_fingerprint(path) -> Optional[str]:
+    """Hash of a file's or directory tree's paths, sizes and mtimes; None if missing"""
+    if not path:
+        return None
+    root = Path(path)
+    if not root.exists():
+        return None
+    files = [root] if root.is_file() else sorted(p for p in root.rglob("*") if p.is_file())
+    entries = []
+    for file in files:
+        stat = file.stat()
+        entries.append([str(file.relative_to(root)) if file != root else root.name, stat.st_size, stat.st_mtime])
+    return content_key({"path": str(root.resolve()), "files": entries})
+
+
+class DiskLRUCache:
+    """Directory of key-named files with a size budget and LRU eviction"""
+
+    def __init__(self, directory: str, suffix: str, max_bytes: int):
+        self.directory = directory
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # path -> (size, last used); built lazily on first write
+        self._index: Optional[Dict[str, tuple]] = None
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}{self.suffix}")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Path of a cached entry (marked as used), or None on a miss"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Bump recency for LRU eviction
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if self._index is not None and path in self._index:
+                self._index[path] = (self._index[path][0], now)
+        return path
+
+    def store(self, key: str, write: Callable[[str], None]) -> str:
+        """Create an entry with write(tmp_path), then evict down to the budget"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Keep the real suffix last; writers such as PIL pick the format from it
+        tmp_path = os.path.join(os.path.dirname(path), f".{key}.{threading.get_ident()}.tmp{self.suffix}")
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            index = self._load_index()
+            index[path] = (os.path.getsize(path), time.time())
+            self._evict(index)
+        return path
+
+    def _load_index(self) -> Dict[str, tuple]:
+        if self._index is None:
+            self._index = {}
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(self.suffix) and not name.startswith("."):
+                        path = os.path.join(root, name)
+                        stat = os.stat(path)
+                        self._index[path] = (stat.st_size, stat.st_mtime)
+        return self._index
+
+    def _evict(self, index: Dict[str, tuple]) -> None:
+        total = sum(size for size, _ in index.values())
+        for path, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            index.pop(path, None)
+            total -= size
+
+
+class LogoCache:
+    """Embedding and image caches bound to one model configuration"""
+
+    def __init__(self, fingerprint: Dict, directory: str = DEFAULT_CACHE_DIR,
+                 embeddings_max_bytes: int = DEFAULT_EMBEDDINGS_MAX_BYTES,
+                 images_max_bytes: int = DEFAULT_IMAGES_MAX_BYTES):
+        self.fingerprint = fingerprint
+        self.embeddings = DiskLRUCache(os.path.join(directory, "embeddings"), ".pt", embeddings_max_bytes)
+        self.images = DiskLRUCache(os.path.join(directory, "images"), ".png", images_max_bytes)
+
+    def _embedding_key(self, prompt: str) -> str:
+        # The LoRA only changes the transformer, so it isn't part of the text-encoder key;
+        # dtype is the resolved torch dtype, and the device decides what "auto" resolved to
+        return content_key({
+            "prompt": prompt,
+            "text_encoder": self.fingerprint.get("text_encoder"),
+            "dtype": self.fingerprint.get("dtype"),
+            "device": self.fingerprint.get("device"),
+        })
+
+    def get_embedding(self, prompt: str) -> Optional[Tuple]:
+        """Cached (prompt_embeds, prompt_embeds_mask) for one prompt, on the CPU"""
+        path = self.embeddings.lookup(self._embedding_key(prompt))
+        if path is None:
+            return None
+        import torch
+        try:
+            entry = torch.load(path, map_location="cpu", weights_only=True)
+        except Exception:
+            return None
+        return entry["prompt_embeds"], entry["prompt_embeds_mask"]
+
+    def put_embedding(self, prompt: str, prompt_embeds, prompt_embeds_mask) -> None:
+        import torch
+        entry = {
+            "prompt_embeds": prompt_embeds.detach().cpu(),
+            "prompt_embeds_mask": prompt_embeds_mask.detach().cpu() if prompt_embeds_mask is not None else None,
+        }
+        self.embeddings.store(self._embedding_key(prompt), lambda tmp: torch.save(entry, tmp))
+
+    def image_key(self, **params) -> str:
+        return content_key({**params, "model": self.fingerprint})
+
+    def has_image(self, key: str) -> bool:
+        return os.path.exists(self.images.path(key))
+
+    def get_image(self, key: str, output: Path) -> bool:
+        """Copy a cached image to output; False on a miss"""
+        path = self.images.lookup(key)
+        if path is None:
+            return False
+        output.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.copyfile(path, output)
+        except FileNotFoundError:
+            # Evicted by another process since the lookup
+            return False
+        return True
+
+    def put_image(self, key: str, image) -> None:
+        self.images.store(key, lambda tmp: image.save(tmp))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "embedding_hits": self.embeddings.hits,
+            "embedding_misses": self.embeddings.misses,
+            "image_hits": self.images.hits,
+            "image_misses": self.images.misses,
+        }
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Logo Generation Worker
+
+Loads the Qwen-Image pipeline and Lightning LoRA once and serves generation
+jobs over a local HTTP endpoint (TCP on localhost or a Unix socket), so each
+logo costs only the denoising steps instead of a multi-GB model load.
+Usage: python logo_worker.py [--port 8766 | --socket /tmp/friday-logo.sock]
+
+Jobs are JSON POSTs to /generate, e.g.
+    curl -X POST localhost:8766/generate -d '{"company": "Rendetalje", "seed": 7}'
+and return {"ok": true, "result": {"output": ..., "timings": {...}}} or
+{"ok": false, "error": "...", "exit_code": N} with generate_logo's exit codes.
+Accepted fields: company, colors, style, industry, prompt, seed, steps, cfg,
+height, width, output. Images are written to client/public. Seeded jobs
+that were generated before are served from the image cache (see
+logo_cache.py; disable with --no-cache).
+
+POST /generate_batch takes company, industry, styles, palettes, seeds, steps,
+cfg, height, width, max_batch and prefix, generates every variant and
+returns the manifest (see generate_logo.generate_variants). styles and
+palettes are non-empty lists of strings and seeds a non-empty list of
+integers.
+"""
+
+import argparse
+import inspect
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable
+
+from generate_logo import (
+    LogoError,
+    add_pipeline_arguments,
+    generate_logo,
+    generate_variants,
+    load_pipeline,
+    make_cache,
+    pipeline_options,
+)
+from local_server import JsonRequestHandler, serve
+
+DEFAULT_PORT = 8766
+# generate_batch list fields and their element types; a JSON string would be iterated per character
+BATCH_LIST_FIELDS = {'styles': str, 'palettes': str, 'seeds': int}
+
+def check_batch_job(job: Dict[str, Any]) -> None:
+    """Raise ValueError unless the job's list fields are non-empty lists of the expected type"""
+    for field, item_type in BATCH_LIST_FIELDS.items():
+        if field not in job:
+            continue
+        value = job[field]
+        if not isinstance(value, list) or not value or not all(
+            isinstance(item, item_type) and not isinstance(item, bool) for item in value
+        ):
+            raise ValueError(f"{field} must be a non-empty list of {item_type.__name__} values")
+
+class LogoWorker:
+    """A loaded pipeline plus a lock; the pipeline runs one job at a time"""
+
+    def __init__(self, pipe, device: str, load_seconds: float, cache=None):
+        self.pipe = pipe
+        self.device = device
+        self.load_seconds = load_seconds
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.jobs_done = 0
+        self.methods: Dict[str, Callable[..., Dict[str, Any]]] = {
+            'generate': generate_logo,
+            'generate_batch': generate_variants,
+        }
+
+    def run(self, method: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one job; timings cover queueing as well as the job's own stages"""
+        job = dict(job)
+        for key in ('output', 'prefix'):
+            if job.get(key):
+                # Jobs may only name files inside client/public
+                job[key] = Path(job[key]).name
+        # Objects only the worker can provide; progress events aren't streamed over HTTP
+        job['cache'] = self.cache
+        job['on_event'] = None
+        job.pop('preview', None)
+        if method == 'generate_batch':
+            check_batch_job(job)
+        function = self.methods[method]
+        inspect.signature(function).bind(self.pipe, **job)
+
+        queued = time.perf_counter()
+        with self.lock:
+            started = time.perf_counter()
+            result = function(self.pipe, **job)
+            self.jobs_done += 1
+        result['timings'] = {'queue': started - queued, **result.get('timings', {})}
+        return result
+
+def make_handler(worker: LogoWorker):
+    """Build a request handler class bound to a LogoWorker"""
+
+    class Handler(JsonRequestHandler):
+        log_prefix = '🎨'
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {
+                    'ok': True,
+                    'device': worker.device,
+                    'load_seconds': worker.load_seconds,
+                    'jobs_done': worker.jobs_done,
+                    'cache': worker.cache.stats() if worker.cache else None,
+                })
+            else:
+                self._send_json(404, {'ok': False, 'error': 'Not found'})
+
+        def do_POST(self):
+            method = self.path.strip('/')
+            if method not in worker.methods:
+                self._send_json(404, {'ok': False, 'error': f"Unknown method: {method}"})
+                return
+            try:
+                job = self._read_json_object()
+            except ValueError as e:
+                self._send_json(400, {'ok': False, 'error': f"Invalid request: {e}"})
+                return
+
+            try:
+                result = worker.run(method, job)
+                self._send_json(200, {'ok': True, 'result': result})
+            except (TypeError, ValueError) as e:
+                self._send_json(400, {'ok': False, 'error': f"Invalid parameters: {e}"})
+            except LogoError as e:
+                self._send_json(500, {'ok': False, 'error': str(e), 'exit_code': e.exit_code})
+            except Exception as e:
+                self._send_json(500, {'ok': False, 'error': str(e)})
+
+    return Handler
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Serve logo generation with a warm diffusion pipeline')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port on 127.0.0.1')
+    parser.add_argument('--socket', default=None, help='Listen on this Unix socket instead of TCP')
+    add_pipeline_arguments(parser)
+
+    args = parser.parse_args()
+
+    print("⏳ Loading pipeline...")
+    start = time.perf_counter()
+    try:
+        pipe, device = load_pipeline(**pipeline_options(args))
+    except LogoError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(e.exit_code)
+    worker = LogoWorker(pipe, device, time.perf_counter() - start, make_cache(args, device))
+    print(f"✅ Pipeline loaded on {device} in {worker.load_seconds:.1f}s")
+
+    serve(make_handler(worker), 'Logo worker', args.port, args.socket)
+
+if __name__ == '__main__':
+    main()
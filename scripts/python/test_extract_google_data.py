@@ -0,0 +1,84 @@
+"""
+Tests for GoogleDataExtractor's batched message fetch and rate limiting
+
+Run with: python -m pytest scripts/python
+"""
+
+import unittest
+from unittest import mock
+
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpMockSequence
+
+from extract_google_data import GoogleDataExtractor, TokenBucket, load_discovery_document
+
+BOUNDARY = 'batch_boundary'
+
+def batch_response(*parts):
+    """A multipart batch response body from (request_id, status, json_body) parts"""
+    chunks = []
+    for request_id, status, body in parts:
+        chunks.append(
+            f'--{BOUNDARY}\r\n'
+            'Content-Type: application/http\r\n'
+            f'Content-ID: <response-test + {request_id}>\r\n\r\n'
+            f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+            'Content-Type: application/json; charset=UTF-8\r\n\r\n'
+            f'{body}\r\n'
+        )
+    chunks.append(f'--{BOUNDARY}--\r\n')
+    return ''.join(chunks)
+
+BATCH_HEADERS = {'status': '200', 'content-type': f'multipart/mixed; boundary={BOUNDARY}'}
+RATE_LIMITED = '{"error": {"code": 429, "message": "Rate Limit Exceeded"}}'
+
+def message(message_id: str) -> str:
+    return f'{{"id": "{message_id}", "threadId": "{message_id}", "labelIds": ["INBOX"]}}'
+
+class BatchGetMessagesTest(unittest.TestCase):
+    def extractor(self, responses):
+        extractor = GoogleDataExtractor()
+        extractor.gmail_service = build_from_document(
+            load_discovery_document('gmail', 'v1'), http=HttpMockSequence(responses)
+        )
+        return extractor
+
+    @mock.patch('extract_google_data.time.sleep')
+    def test_retries_rate_limited_items(self, sleep):
+        extractor = self.extractor([
+            (BATCH_HEADERS, batch_response(('a', 200, message('a')), ('b', 429, RATE_LIMITED))),
+            (BATCH_HEADERS, batch_response(('b', 200, message('b')))),
+        ])
+
+        details = extractor._batch_get_messages(['a', 'b'])
+
+        self.assertEqual(sorted(details), ['a', 'b'])
+        self.assertEqual(details['b']['id'], 'b')
+        sleep.assert_called_once()
+
+    @mock.patch('extract_google_data.time.sleep')
+    def test_retries_failed_batch_request(self, sleep):
+        extractor = self.extractor([
+            ({'status': '503'}, ''),
+            (BATCH_HEADERS, batch_response(('a', 200, message('a')))),
+        ])
+
+        details = extractor._batch_get_messages(['a'])
+
+        self.assertEqual(list(details), ['a'])
+        sleep.assert_called_once()
+
+class TokenBucketTest(unittest.TestCase):
+    def test_oversized_acquire_waits_for_a_full_bucket_then_goes_into_debt(self):
+        bucket = TokenBucket(rate=250)
+        with mock.patch('extract_google_data.time.sleep') as sleep:
+            bucket.acquire(500)
+        sleep.assert_not_called()
+        self.assertLess(bucket.tokens, -249)
+
+        with mock.patch('extract_google_data.time.sleep', side_effect=RuntimeError('would block')):
+            with self.assertRaises(RuntimeError):
+                bucket.acquire(1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+"""
+Tests for the extractor daemon's RPC methods
+
+Run with: python -m pytest scripts/python
+"""
+
+import unittest
+from unittest import mock
+
+from extractor_daemon import ExtractorService
+
+class ExtractorServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.extractor = mock.Mock()
+        self.extractor.iter_emails.return_value = iter([])
+        self.extractor.iter_calendar_events.return_value = iter([])
+        self.service = ExtractorService(self.extractor)
+
+    def test_zero_max_results_fetches_everything_like_the_cli(self):
+        self.service.call('fetch_emails', {'max_results': 0})
+        self.service.call('fetch_events', {'max_results': 0})
+
+        self.extractor.iter_emails.assert_called_once_with(max_results=None, batch=False)
+        self.extractor.iter_calendar_events.assert_called_once_with(days_ahead=7, max_results=None)
+
+    def test_positive_max_results_is_passed_through(self):
+        self.service.call('fetch_emails', {'max_results': 20})
+
+        self.extractor.iter_emails.assert_called_once_with(max_results=20, batch=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+"""
+Tests for Gmail Date header parsing
+
+Run with: python -m pytest scripts/python
+"""
+
+import unittest
+
+from gmail_normalize import normalize_email, parse_email_date
+
+class ParseEmailDateTest(unittest.TestCase):
+    def test_gmt_offsets_keep_their_sign(self):
+        self.assertEqual(parse_email_date('Mon, 3 Feb 2025 10:00:00 GMT+1'), '2025-02-03T10:00:00+01:00')
+        self.assertEqual(parse_email_date('3 Feb 2025 10:00 UTC-05:30'), '2025-02-03T10:00:00-05:30')
+
+    def test_named_zones(self):
+        self.assertEqual(parse_email_date('Mon, 3 Feb 2025 10:00:00 CET'), '2025-02-03T10:00:00+01:00')
+
+    def test_values_without_a_full_date_are_rejected(self):
+        self.assertIsNone(parse_email_date('Sent at 5'))
+        self.assertIsNone(parse_email_date('garbage'))
+
+    def test_unparseable_date_falls_back_to_internal_date(self):
+        email = normalize_email('a', {
+            'internalDate': '1738576800000',
+            'payload': {'headers': [{'name': 'Date', 'value': 'Sent at 5'}]},
+        })
+        self.assertEqual(email['date'], '2025-02-03T10:00:00+00:00')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+"""
+Tests for the logo worker's job validation
+
+Run with: python -m pytest scripts/python
+"""
+
+import unittest
+
+from logo_worker import check_batch_job
+
+class CheckBatchJobTest(unittest.TestCase):
+    def test_accepts_lists_of_the_expected_types(self):
+        check_batch_job({'company': 'Rendetalje', 'styles': ['bold'], 'palettes': ['#000,#fff'], 'seeds': [1, 2]})
+        check_batch_job({'company': 'Rendetalje'})
+
+    def test_rejects_strings_and_mixed_lists(self):
+        for job in ({'styles': 'bold'}, {'palettes': '#000,#fff'}, {'seeds': [1, '2']},
+                    {'seeds': [True]}, {'styles': []}):
+            with self.subTest(job=job), self.assertRaises(ValueError):
+                check_batch_job(job)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,13 +14,21 @@ type LogoConfig = {
   cfg?: number;
   height?: number;
   width?: number;
+  // Seeded requests are reproducible and served from the logo cache when repeated
+  seed?: number;
   baseDir?: string;
   loraPath?: string;
 };
 
 export async function generateLogoWithQwen(config: LogoConfig): Promise<string> {
-  const script = path.join(process.cwd(), "scripts", "python", "generate_logo.py");
   const outName = `${config.companyName.toLowerCase().replace(/\s+/g, "-")}-logo.png`;
+  // A running logo_worker.py keeps the pipeline loaded between requests
+  const workerUrl = process.env.LOGO_WORKER_URL;
+  if (workerUrl) {
+    return generateLogoWithWorker(workerUrl, config, outName);
+  }
+
+  const script = path.join(process.cwd(), "scripts", "python", "generate_logo.py");
   const args = [
     `--company "${config.companyName}"`,
     config.colors ? `--colors "${config.colors}"` : "",
@@ -30,6 +38,7 @@ export async function generateLogoWithQwen(config: LogoConfig): Promise<string>
     config.cfg ? `--cfg ${config.cfg}` : "",
     config.height ? `--height ${config.height}` : "",
     config.width ? `--width ${config.width}` : "",
+    config.seed !== undefined ? `--seed ${config.seed}` : "",
     config.baseDir ? `--base_dir "${config.baseDir}"` : "",
     config.loraPath ? `--lora_path "${config.loraPath}"` : "",
     `--output "${outName}"`,
@@ -49,4 +58,35 @@ export async function generateLogoWithQwen(config: LogoConfig): Promise<string>
     throw new Error(`Logo not found at ${outPath}. Output:\n${stdout}`);
   }
   return outPath;
-}
\ No newline at end of file
+}
+async function generateLogoWithWorker(
+  workerUrl: string,
+  config: LogoConfig,
+  outName: string
+): Promise<string> {
+  const response = await fetch(`${workerUrl.replace(/\/$/, "")}/generate`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      company: config.companyName,
+      colors: config.colors,
+      style: config.style,
+      industry: config.industry,
+      steps: config.steps,
+      cfg: config.cfg,
+      height: config.height,
+      width: config.width,
+      seed: config.seed,
+      output: outName,
+    }),
+  });
+  const payload = (await response.json()) as {
+    ok: boolean;
+    error?: string;
+    result?: { output: string };
+  };
+  if (!payload.ok || !payload.result) {
+    throw new Error(`Logo worker failed: ${payload.error ?? response.statusText}`);
+  }
+  return payload.result.output;
+}
@@ -0,0 +1,146 @@
+"""
+Content-addressed on-disk cache for model completions
+
+Entries are keyed by a SHA-256 of the endpoint URL and the full request
+payload (model, messages, temperature, max_tokens, ...) and store the complete response plus request
+metadata, so cached eval runs are reproducible. Entries expire after a TTL,
+and the least recently used entries are evicted once the cache exceeds its
+size budget.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join("test-results", "completion-cache")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+
+def payload_key(payload: Dict, endpoint: str = "") -> str:
+    """Stable content hash of a request payload sent to an endpoint"""
+    canonical = json.dumps(
+        {"endpoint": endpoint, "payload": payload},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """Thread-safe completion cache with TTL expiry and LRU size eviction
+
+    read=False skips lookups but still stores fresh responses (refresh mode);
+    enabled=False turns the cache off entirely. Entries for different
+    endpoints never collide.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "",
+        directory: str = DEFAULT_CACHE_DIR,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        read: bool = True,
+        enabled: bool = True,
+    ):
+        self.endpoint = endpoint
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.read = read
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # path -> (size, last used); built lazily on first write
+        self._index: Optional[Dict[str, tuple]] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, payload: Dict) -> Optional[Dict]:
+        """Return the cached response for a payload, or None on a miss"""
+        if not (self.enabled and self.read):
+            return None
+
+        path = self._path(payload_key(payload, self.endpoint))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Bump recency for LRU eviction
+        now = time.time()
+        os.utime(path, (now, now))
+        with self._lock:
+            self.hits += 1
+            if self._index is not None and path in self._index:
+                self._index[path] = (self._index[path][0], now)
+        return entry["response"]
+
+    def put(self, payload: Dict, response: Dict) -> None:
+        """Store a response together with the request that produced it"""
+        if not self.enabled:
+            return
+
+        path = self._path(payload_key(payload, self.endpoint))
+        entry = {
+            "created_at": time.time(),
+            "endpoint": self.endpoint,
+            "request": payload,
+            "response": response,
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            index = self._load_index()
+            index[path] = (os.path.getsize(path), time.time())
+            self._evict(index)
+
+    def _load_index(self) -> Dict[str, tuple]:
+        if self._index is None:
+            self._index = {}
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".json"):
+                        path = os.path.join(root, name)
+                        stat = os.stat(path)
+                        self._index[path] = (stat.st_size, stat.st_mtime)
+        return self._index
+
+    def _evict(self, index: Dict[str, tuple]) -> None:
+        """Drop entries unused for a full TTL, then least recently used ones until under budget"""
+        cutoff = time.time() - self.ttl_seconds
+        for path in [p for p, (_, used) in index.items() if used < cutoff]:
+            self._remove(path)
+            index.pop(path, None)
+
+        total = sum(size for size, _ in index.values())
+        for path, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            index.pop(path, None)
+            total -= size
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -4,15 +4,23 @@ Evaluates OpenRouter free tier models on various metrics
 
 Installation:
 pip install deepeval openai requests
+pip install pyarrow  # only for Parquet corpora
 
 Usage:
-python tests/ai/deepeval-test.py
+python tests/ai/deepeval-test.py [--workers 8 --per-model-concurrency 2] [--no-cache | --refresh]
+python tests/ai/deepeval-test.py --benchmark [--benchmark-only] [--trials 20 --benchmark-concurrency 4]
+python tests/ai/deepeval-test.py --corpus emails.jsonl calendar.parquet --shard 0/4 [--resume]
+python tests/ai/deepeval-test.py --merge-results test-results/deepeval-results.shard-*-of-4.jsonl
 """
 
+import argparse
 import os
-from typing import List, Dict
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
 from deepeval import evaluate
+from deepeval.evaluate.configs import AsyncConfig, DisplayConfig, ErrorConfig
 from deepeval.metrics import (
     AnswerRelevancyMetric,
     FaithfulnessMetric,
@@ -21,9 +29,45 @@ from deepeval.metrics import (
 )
 from deepeval.test_case import LLMTestCase
 
+from completion_cache import CompletionCache, DEFAULT_CACHE_DIR
+from eval_corpus import (
+    CorpusError,
+    ResultCheckpoint,
+    batched,
+    iter_test_cases,
+    merge_results,
+    parse_shard,
+    shard_of,
+    shard_results_path,
+)
+from latency_benchmark import (
+    DEFAULT_CONCURRENCY as DEFAULT_BENCHMARK_CONCURRENCY,
+    DEFAULT_TRIALS,
+    print_benchmark_table,
+    run_trials,
+    summarize_trials,
+    write_report,
+)
+from local_scorers import LocalScore, run_local_scorers, scoring_mode
+from openrouter_client import OpenRouterClient
+
 # OpenRouter Configuration
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", "")
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_URL = os.environ.get("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+# Concurrent evaluation defaults (free-tier models allow only a few parallel requests)
+DEFAULT_WORKERS = 1
+DEFAULT_PER_MODEL_CONCURRENCY = 2
+# Concurrent judge-model calls while scoring a batch
+JUDGE_CONCURRENCY = 10
+
+# Test cases generated and scored together; bounds memory for large corpora
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_RESULTS_FILE = os.path.join("test-results", "deepeval-results.jsonl")
+
+DEFAULT_BENCHMARK_REPORT = os.path.join("test-results", "latency-benchmark.json")
+# Share of the final ranking score given to speed (0 = accuracy only)
+DEFAULT_LATENCY_WEIGHT = 0.3
 
 # Models to evaluate (100% accuracy models)
 MODELS_TO_TEST = [
@@ -50,26 +94,41 @@ MODELS_TO_TEST = [
 ]
 
 
-def call_openrouter(model_id: str, messages: List[Dict]) -> str:
-    """Call OpenRouter API with specified model"""
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
+OPENROUTER_CLIENT = OpenRouterClient(
+    OPENROUTER_API_KEY,
+    OPENROUTER_URL,
+    headers={
         "HTTP-Referer": "https://tekup.dk",
         "X-Title": "Friday AI - DeepEval Testing",
-    }
-    
-    payload = {
+    },
+)
+
+# Completions are cached on disk by payload hash; see --no-cache / --refresh
+COMPLETION_CACHE = CompletionCache(OPENROUTER_URL)
+
+
+def build_payload(model_id: str, messages: List[Dict]) -> Dict:
+    """Chat completion request body shared by evaluation and benchmarking"""
+    return {
         "model": model_id,
         "messages": messages,
         "temperature": 0.7,
         "max_tokens": 2000,
     }
+
+
+def call_openrouter(model_id: str, messages: List[Dict]) -> str:
+    """Call OpenRouter API with specified model"""
+    payload = build_payload(model_id, messages)
     
-    response = requests.post(OPENROUTER_URL, json=payload, headers=headers)
-    response.raise_for_status()
+    data = COMPLETION_CACHE.get(payload)
+    if data is None:
+        data = OPENROUTER_CLIENT.post(payload)
+        # OpenRouter reports some failures as HTTP 200 with an error body; never cache those
+        if not data.get("choices"):
+            raise ValueError(f"No choices in OpenRouter response: {data.get('error', data)}")
+        COMPLETION_CACHE.put(payload, data)
     
-    data = response.json()
     return data["choices"][0]["message"]["content"]
 
 
@@ -88,6 +147,7 @@ TEST_CASES = [
         "expected_output": "To forslag: 11:30-13:30 eller 15:00-17:00 (men 17:00 er uden for vinduet, så kun 11:30-13:30)",
         "context": ["Mødet skal være 2 timer", "Kun onsdag mellem 10-16"],
         "retrieval_context": ["Eksisterende møder: 10:00-11:30 og 14:00-15:00"],
+        "local_scorers": [{"type": "time_slots", "expected": ["11:30-13:30"]}],
     },
     {
         "name": "Invoice Data Extraction",
@@ -95,6 +155,8 @@ TEST_CASES = [
         "expected_output": '{"items": ["Badekar", "Fliser", "VVS"], "amounts": [15000, 28500, 12000], "customer": "Tomas Jensen", "address": "Hovedgaden 42", "date": "2024-03-15"}',
         "context": ["Returner struktureret JSON data"],
         "retrieval_context": ["Typisk faktura format med items, beløb, kunde info"],
+        "local_scorers": [{"type": "json_fields"}],
+        "scoring_mode": "short_circuit",
     },
     {
         "name": "Code Generation - TypeScript",
@@ -102,75 +164,258 @@ TEST_CASES = [
         "expected_output": "TypeScript funktion med typer, der grupperer efter måned og summer beløb",
         "context": ["Brug TypeScript med proper typing", "Inkluder JSDoc comments"],
         "retrieval_context": ["Invoice type har amount og date felter"],
+        "local_scorers": [{"type": "regex", "pattern": r"/\*\*"}],
     },
 ]
 
 
-def evaluate_model(model: Dict) -> Dict:
-    """Evaluate a single model on all test cases"""
-    print(f"\n{'='*60}")
-    print(f"Evaluating: {model['name']} ({model['description']})")
-    print(f"Model ID: {model['id']}")
-    print(f"{'='*60}\n")
+def build_messages(test_case_data: Dict) -> List[Dict]:
+    """Build the chat messages sent to a model for a test case"""
+    return [
+        {
+            "role": "system",
+            "content": "Du er Friday, en professionel dansk executive assistant for Rendetalje.",
+        },
+        {"role": "user", "content": test_case_data["input"]},
+    ]
+
+
+def build_metrics() -> List:
+    """Judge metrics shared by every test case in a scoring batch"""
+    return [
+        AnswerRelevancyMetric(threshold=0.7),
+        FaithfulnessMetric(threshold=0.7),
+        HallucinationMetric(threshold=0.5),
+    ]
+
+
+def generate_output(model: Dict, test_case_data: Dict) -> Dict:
+    """Phase one: get a model's output for one test case"""
+    print(f"Running test: {test_case_data['name']} ({model['name']})...")
     
-    results = []
+    # Call model
+    messages = build_messages(test_case_data)
+    
+    try:
+        actual_output = call_openrouter(model["id"], messages)
+        return {
+            "test_name": test_case_data["name"],
+            "actual_output": actual_output,
+        }
+        
+    except Exception as e:
+        print(f"  ✗ Error: {str(e)} ({model['name']} / {test_case_data['name']})")
+        return {
+            "test_name": test_case_data["name"],
+            "success": False,
+            "error": str(e),
+        }
+
+
+def generate_outputs(
+    models: List[Dict],
+    test_cases: List[Dict],
+    max_workers: int = DEFAULT_WORKERS,
+    per_model_concurrency: int = DEFAULT_PER_MODEL_CONCURRENCY,
+    known: Optional[Dict[tuple, Dict]] = None,
+    on_generated: Optional[Callable[[Dict, Dict], None]] = None,
+) -> List[List[Dict]]:
+    """Phase one for the whole model × test case matrix
+    
+    With max_workers > 1 the matrix runs on a bounded thread pool, with at
+    most per_model_concurrency cases in flight per model (a model entry may
+    override this with "max_concurrency") to respect free-tier rate limits.
+    Pairs found in known (keyed by model ID and test name) are not sent to
+    the model; on_generated is called with each fresh generation as soon as
+    it completes. Returns one list of generations per model, in test_cases
+    order.
+    """
+    known = known or {}
     
-    for test_case_data in TEST_CASES:
-        print(f"Running test: {test_case_data['name']}...")
+    def run(model: Dict, test_case_data: Dict) -> Dict:
+        generation = generate_output(model, test_case_data)
+        if on_generated:
+            on_generated(model, generation)
+        return generation
+    
+    results: Dict[tuple, Dict] = {}
+    # Interleave models so early pool slots aren't all waiting on one model's cap
+    jobs = [
+        (model_index, case_index)
+        for case_index in range(len(test_cases))
+        for model_index in range(len(models))
+    ]
+    for model_index, case_index in jobs:
+        key = (models[model_index]["id"], test_cases[case_index]["name"])
+        if key in known:
+            results[(model_index, case_index)] = known[key]
+    jobs = [job for job in jobs if job not in results]
+    
+    if max_workers <= 1:
+        for model_index, case_index in sorted(jobs):
+            results[(model_index, case_index)] = run(models[model_index], test_cases[case_index])
+    else:
+        semaphores = {
+            model["id"]: threading.BoundedSemaphore(model.get("max_concurrency", per_model_concurrency))
+            for model in models
+        }
         
-        # Call model
-        messages = [
-            {
-                "role": "system",
-                "content": "Du er Friday, en professionel dansk executive assistant for Rendetalje.",
-            },
-            {"role": "user", "content": test_case_data["input"]},
-        ]
+        def run_limited(model: Dict, test_case_data: Dict) -> Dict:
+            with semaphores[model["id"]]:
+                return run(model, test_case_data)
         
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(run_limited, models[model_index], test_cases[case_index]): (model_index, case_index)
+                for model_index, case_index in jobs
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+    
+    return [
+        [results[(model_index, case_index)] for case_index in range(len(test_cases))]
+        for model_index in range(len(models))
+    ]
+
+
+def score_outputs(models: List[Dict], test_cases: List[Dict], generations: List[List[Dict]]) -> List[List[Dict]]:
+    """Phase two: score every generated output, judging in one batched evaluate() call
+    
+    Local deterministic scorers run first (see local_scorers); outputs they
+    fail, and outputs of short_circuit cases, are decided without the judge.
+    The remaining LLMTestCases (across models) share one set of metric
+    objects and are judged concurrently by deepeval; results are mapped back
+    to their model and test case through the test case name. A metric that
+    errors fails only its own case; scoring_error covers failures of the
+    evaluate() call itself.
+    """
+    local_scores: Dict[str, List[LocalScore]] = {}
+    llm_test_cases = []
+    for model, model_generations in zip(models, generations):
+        for test_case_data, generation in zip(test_cases, model_generations):
+            if "actual_output" not in generation:
+                continue
+            name = f"{model['id']}::{test_case_data['name']}"
+            try:
+                local_scores[name] = run_local_scorers(test_case_data, generation["actual_output"])
+            except Exception as e:
+                # A broken scorer config fails its own case, not the whole batch
+                local_scores[name] = [LocalScore("local_scorers", 0.0, False, f"Scorer error: {e}")]
+            if scoring_mode(test_case_data) == "short_circuit" and local_scores[name]:
+                continue
+            if not all(score.success for score in local_scores[name]):
+                continue
+            llm_test_cases.append(
+                LLMTestCase(
+                    name=name,
+                    input=test_case_data["input"],
+                    actual_output=generation["actual_output"],
+                    expected_output=test_case_data["expected_output"],
+                    context=test_case_data["context"],
+                    retrieval_context=test_case_data["retrieval_context"],
+                )
+            )
+    
+    judged = {test_case.name for test_case in llm_test_cases}
+    decided_locally = len(local_scores) - len(judged)
+    if decided_locally:
+        print(f"\n{decided_locally} outputs decided by local scorers without the judge")
+    
+    scored: Dict[str, object] = {}
+    scoring_error = None
+    if llm_test_cases:
+        print(f"\nScoring {len(llm_test_cases)} outputs in one batch...")
         try:
-            actual_output = call_openrouter(model["id"], messages)
-            
-            # Create DeepEval test case
-            test_case = LLMTestCase(
-                input=test_case_data["input"],
-                actual_output=actual_output,
-                expected_output=test_case_data["expected_output"],
-                context=test_case_data["context"],
-                retrieval_context=test_case_data["retrieval_context"],
+            eval_results = evaluate(
+                llm_test_cases,
+                build_metrics(),
+                async_config=AsyncConfig(run_async=True, max_concurrent=JUDGE_CONCURRENCY),
+                display_config=DisplayConfig(print_results=False),
+                # A judge error fails only its own test case and metric, not the whole batch
+                error_config=ErrorConfig(ignore_errors=True),
             )
+            scored = {test_result.name: test_result for test_result in eval_results.test_results}
+        except Exception as e:
+            print(f"  ✗ Scoring failed: {str(e)}")
+            scoring_error = str(e)
+    
+    results = []
+    for model, model_generations in zip(models, generations):
+        model_results = []
+        for generation in model_generations:
+            if "actual_output" not in generation:
+                model_results.append(generation)
+                continue
             
-            # Evaluate with metrics
-            metrics = [
-                AnswerRelevancyMetric(threshold=0.7),
-                FaithfulnessMetric(threshold=0.7),
-                HallucinationMetric(threshold=0.5),
-            ]
-            
-            # Run evaluation
-            eval_results = evaluate([test_case], metrics)
+            name = f"{model['id']}::{generation['test_name']}"
+            local = local_scores[name]
+            local_success = all(score.success for score in local)
+            test_result = scored.get(name)
             
-            results.append(
-                {
-                    "test_name": test_case_data["name"],
-                    "success": eval_results.successful,
-                    "actual_output": actual_output,
-                    "metrics": eval_results.metrics_data,
-                }
-            )
+            if name not in judged:
+                print(f"  ✓ Success: {local_success} (local) ({model['name']} / {generation['test_name']})")
+                model_results.append(
+                    {
+                        "test_name": generation["test_name"],
+                        "success": local_success,
+                        "actual_output": generation["actual_output"],
+                        "metrics": local,
+                    }
+                )
+                continue
             
-            print(f"  ✓ Success: {eval_results.successful}")
+            if test_result is None:
+                model_results.append(
+                    {
+                        "test_name": generation["test_name"],
+                        "success": False,
+                        "actual_output": generation["actual_output"],
+                        "error": scoring_error or "No evaluation result returned",
+                    }
+                )
+                continue
             
-        except Exception as e:
-            print(f"  ✗ Error: {str(e)}")
-            results.append(
+            print(f"  ✓ Success: {test_result.success} ({model['name']} / {generation['test_name']})")
+            model_results.append(
                 {
-                    "test_name": test_case_data["name"],
-                    "success": False,
-                    "error": str(e),
+                    "test_name": generation["test_name"],
+                    "success": test_result.success and local_success,
+                    "actual_output": generation["actual_output"],
+                    "metrics": local + list(test_result.metrics_data or []),
                 }
             )
+        results.append(model_results)
     
-    # Calculate overall score
+    return results
+
+
+def metric_record(metric_data) -> Dict:
+    """JSON-serializable view of a deepeval MetricData"""
+    return {
+        "name": getattr(metric_data, "name", None),
+        "score": getattr(metric_data, "score", None),
+        "threshold": getattr(metric_data, "threshold", None),
+        "success": getattr(metric_data, "success", None),
+        "reason": getattr(metric_data, "reason", None),
+        "error": getattr(metric_data, "error", None),
+    }
+
+
+def result_record(model: Dict, result: Dict) -> Dict:
+    """One line of a results file: a model's result for one test case"""
+    return {
+        "model_id": model["id"],
+        "model_name": model["name"],
+        "test_name": result["test_name"],
+        "success": bool(result.get("success")),
+        "error": result.get("error"),
+        "actual_output": result.get("actual_output"),
+        "metrics": [metric_record(m) for m in result.get("metrics") or []],
+    }
+
+
+def summarize_model(model: Dict, results: List[Dict]) -> Dict:
+    """Calculate and print a model's overall score from its test results"""
     successful_tests = sum(1 for r in results if r.get("success"))
     total_tests = len(results)
     accuracy = (successful_tests / total_tests) * 100 if total_tests > 0 else 0
@@ -189,32 +434,275 @@ def evaluate_model(model: Dict) -> Dict:
     }
 
 
+def evaluate_model(model: Dict) -> Dict:
+    """Evaluate a single model on all test cases"""
+    print(f"\n{'='*60}")
+    print(f"Evaluating: {model['name']} ({model['description']})")
+    print(f"Model ID: {model['id']}")
+    print(f"{'='*60}\n")
+    
+    generations = generate_outputs([model], TEST_CASES)
+    results = score_outputs([model], TEST_CASES, generations)[0]
+    
+    return summarize_model(model, results)
+
+
+def evaluate_models(
+    models: List[Dict],
+    max_workers: int = DEFAULT_WORKERS,
+    per_model_concurrency: int = DEFAULT_PER_MODEL_CONCURRENCY,
+    test_cases: Optional[Iterable[Dict]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    results_file: Optional[str] = None,
+    resume: bool = False,
+) -> List[Dict]:
+    """Generate outputs for every model, then score them in batches
+    
+    test_cases may be any iterable (e.g. a streamed corpus) and defaults to
+    TEST_CASES; it is consumed batch_size cases at a time, each batch scored
+    in one evaluate() call. With a results_file, every output is checkpointed
+    as soon as it is generated and every result as soon as it is scored;
+    resume=True picks up from that file instead of starting over, and the
+    summaries are rebuilt from it.
+    Returns per-model summaries like evaluate_model, in model order.
+    """
+    checkpoint = ResultCheckpoint(results_file, resume=resume) if results_file else None
+    model_results: List[List[Dict]] = [[] for _ in models]
+    
+    if checkpoint and resume:
+        print(
+            f"Resuming from {results_file}: {len(checkpoint.completed)} results done, "
+            f"{len(checkpoint.generated)} outputs awaiting scoring"
+        )
+    
+    def checkpoint_generation(model: Dict, generation: Dict) -> None:
+        if "actual_output" in generation:
+            checkpoint.append({**result_record(model, generation), "stage": "generated"})
+    
+    try:
+        for batch in batched(TEST_CASES if test_cases is None else test_cases, batch_size):
+            known = checkpoint.known([model["id"] for model in models], batch) if checkpoint else {}
+            generations = generate_outputs(
+                models, batch, max_workers, per_model_concurrency,
+                known=known,
+                on_generated=checkpoint_generation if checkpoint else None,
+            )
+            scored = score_outputs(models, batch, generations)
+            
+            for model, results, bucket in zip(models, scored, model_results):
+                for result in results:
+                    if checkpoint is None:
+                        bucket.append(result)
+                    elif (model["id"], result["test_name"]) not in checkpoint.completed:
+                        checkpoint.append({**result_record(model, result), "stage": "scored"})
+    finally:
+        if checkpoint:
+            checkpoint.close()
+    
+    if checkpoint:
+        buckets = {model["id"]: bucket for model, bucket in zip(models, model_results)}
+        for record in checkpoint.final_records():
+            if record["model_id"] in buckets:
+                buckets[record["model_id"]].append(record)
+    
+    return [summarize_model(model, results) for model, results in zip(models, model_results)]
+
+
+def summarize_records(records: List[Dict]) -> List[Dict]:
+    """Per-model summaries rebuilt from result records (e.g. merged shard files)"""
+    known = {model["id"]: model for model in MODELS_TO_TEST}
+    grouped: Dict[str, List[Dict]] = {}
+    for record in records:
+        grouped.setdefault(record["model_id"], []).append(record)
+    
+    return [
+        summarize_model(
+            known.get(model_id, {"id": model_id, "name": results[0]["model_name"], "description": ""}),
+            results,
+        )
+        for model_id, results in grouped.items()
+    ]
+
+
+def benchmark_model(model: Dict, trials: int = DEFAULT_TRIALS,
+                    concurrency: int = DEFAULT_BENCHMARK_CONCURRENCY) -> Dict:
+    """Stream `trials` uncached completions from a model, cycling through TEST_CASES"""
+    print(f"Benchmarking: {model['name']} ({trials} trials, concurrency {concurrency})...")
+    payloads = [
+        build_payload(model["id"], build_messages(TEST_CASES[trial % len(TEST_CASES)]))
+        for trial in range(trials)
+    ]
+    return summarize_trials(run_trials(OPENROUTER_CLIENT, payloads, concurrency))
+
+
+def benchmark_models(models: List[Dict], trials: int = DEFAULT_TRIALS,
+                     concurrency: int = DEFAULT_BENCHMARK_CONCURRENCY) -> Dict[str, Dict]:
+    """Benchmark models one after another so each sees only its own load
+    
+    Returns latency summaries keyed by model ID.
+    """
+    return {model["id"]: benchmark_model(model, trials, concurrency) for model in models}
+
+
+def rank_models(all_results: List[Dict], benchmarks: Dict[str, Dict],
+                latency_weight: float = DEFAULT_LATENCY_WEIGHT) -> List[Dict]:
+    """Rank models by accuracy blended with speed
+    
+    The speed score is 100 × (fastest p50 latency / model p50 latency),
+    scaled down by the model's benchmark error rate. Models without a
+    benchmark keep a score of accuracy alone.
+    """
+    p50s = [b["latency_p50"] for b in benchmarks.values() if b["latency_p50"]]
+    fastest = min(p50s) if p50s else None
+    
+    ranked = []
+    for result in all_results:
+        benchmark = benchmarks.get(result["model"]["id"])
+        if benchmark is None or fastest is None:
+            ranked.append({**result, "speed_score": None, "score": result["accuracy"]})
+            continue
+        
+        p50 = benchmark["latency_p50"]
+        speed_score = 100 * fastest / p50 * (1 - benchmark["error_rate"]) if p50 else 0.0
+        score = (1 - latency_weight) * result["accuracy"] + latency_weight * speed_score
+        ranked.append({**result, "speed_score": speed_score, "score": score})
+    
+    return sorted(ranked, key=lambda x: x["score"], reverse=True)
+
+
 def main():
     """Run evaluation for all models"""
-    if not OPENROUTER_API_KEY:
-        print("Error: OPENROUTER_API_KEY environment variable not set")
-        return
+    parser = argparse.ArgumentParser(description="Evaluate Friday AI models with DeepEval")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Run the model × test case matrix on this many threads (1 = serial)")
+    parser.add_argument("--per-model-concurrency", type=int, default=DEFAULT_PER_MODEL_CONCURRENCY,
+                        help="Max in-flight test cases per model in concurrent mode")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Neither read nor write the completion cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached completions but store the fresh ones")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Completion cache directory")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Also measure streaming latency (TTFT, p50/p95/p99, tokens/sec)")
+    parser.add_argument("--benchmark-only", action="store_true",
+                        help="Run the latency benchmark without the DeepEval evaluation")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS,
+                        help="Streamed completions per model in the benchmark")
+    parser.add_argument("--benchmark-concurrency", type=int, default=DEFAULT_BENCHMARK_CONCURRENCY,
+                        help="In-flight benchmark requests per model")
+    parser.add_argument("--benchmark-report", default=DEFAULT_BENCHMARK_REPORT,
+                        help="Where to write the JSON benchmark report")
+    parser.add_argument("--latency-weight", type=float, default=DEFAULT_LATENCY_WEIGHT,
+                        help="Weight of speed vs accuracy in the ranking (0-1)")
+    parser.add_argument("--corpus", nargs="+", default=None,
+                        help="Stream test cases from these .jsonl/.jsonl.gz/.parquet files instead of TEST_CASES")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1),
+                        help="Evaluate only shard i of n (0 <= i < n), e.g. 0/4")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Test cases generated and scored per batch")
+    parser.add_argument("--results-file", default=DEFAULT_RESULTS_FILE,
+                        help="JSONL result records (a .shard-i-of-n suffix is added when sharding)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the results file, skipping completed model/test pairs")
+    parser.add_argument("--merge-results", nargs="+", default=None,
+                        help="Merge these per-shard result files into --results-file and summarize them")
+    args = parser.parse_args()
     
-    print("="*60)
-    print("Friday AI - Model Evaluation with DeepEval")
-    print("="*60)
+    COMPLETION_CACHE.directory = args.cache_dir
+    COMPLETION_CACHE.enabled = not args.no_cache
+    COMPLETION_CACHE.read = not args.refresh
+    
+    all_results: List[Dict] = []
+    benchmarks: Dict[str, Dict] = {}
+    
+    if args.merge_results:
+        records = merge_results(args.merge_results, args.results_file)
+        print(f"Merged {len(records)} results from {len(args.merge_results)} files into {args.results_file}")
+        all_results = summarize_records(records)
+    
+    else:
+        if not OPENROUTER_API_KEY:
+            print("Error: OPENROUTER_API_KEY environment variable not set")
+            return
+        
+        print("="*60)
+        print("Friday AI - Model Evaluation with DeepEval")
+        print("="*60)
+        
+        if not args.benchmark_only:
+            shard_index, shard_count = args.shard
+            if args.corpus:
+                test_cases = iter_test_cases(args.corpus, args.shard)
+            else:
+                test_cases = [tc for tc in TEST_CASES if shard_of(tc["name"], shard_count) == shard_index]
+            results_file = shard_results_path(args.results_file, args.shard)
+            
+            try:
+                all_results = evaluate_models(
+                    MODELS_TO_TEST,
+                    max_workers=args.workers,
+                    per_model_concurrency=args.per_model_concurrency,
+                    test_cases=test_cases,
+                    batch_size=args.batch_size,
+                    results_file=results_file,
+                    resume=args.resume,
+                )
+            except CorpusError as e:
+                print(f"Error: {e} (results so far are in {results_file})")
+                return
+            print(f"\nResults: {results_file}")
+        
+        if args.benchmark or args.benchmark_only:
+            print("\n" + "="*60)
+            print("LATENCY BENCHMARK")
+            print("="*60)
+            
+            benchmarks = benchmark_models(MODELS_TO_TEST, args.trials, args.benchmark_concurrency)
+            print_benchmark_table({model["name"]: benchmarks[model["id"]] for model in MODELS_TO_TEST})
+            
+            write_report(args.benchmark_report, {
+                "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "trials": args.trials,
+                "concurrency": args.benchmark_concurrency,
+                "models": {
+                    model["id"]: {"name": model["name"], **benchmarks[model["id"]]}
+                    for model in MODELS_TO_TEST
+                },
+            })
+            print(f"\nBenchmark report: {args.benchmark_report}")
     
-    all_results = []
+    if not all_results:
+        return
     
-    for model in MODELS_TO_TEST:
-        model_results = evaluate_model(model)
-        all_results.append(model_results)
+    ranked = rank_models(all_results, benchmarks, args.latency_weight)
     
     # Final summary
     print("\n" + "="*60)
     print("FINAL SUMMARY")
     print("="*60)
     
-    for result in sorted(all_results, key=lambda x: x["accuracy"], reverse=True):
-        print(f"{result['model']['name']:25} {result['accuracy']:5.1f}% accuracy")
+    for result in ranked:
+        if result["speed_score"] is None:
+            print(f"{result['model']['name']:25} {result['accuracy']:5.1f}% accuracy")
+        else:
+            print(
+                f"{result['model']['name']:25} {result['accuracy']:5.1f}% accuracy, "
+                f"{result['speed_score']:5.1f} speed, {result['score']:5.1f} score"
+            )
+    
+    print("\nAPI usage:")
+    for model_id, usage in OPENROUTER_CLIENT.usage_summary().items():
+        print(
+            f"  {model_id:35} {usage['calls']:3} calls, {usage['retries']} retries, "
+            f"p50 {usage['latency_p50']:.2f}s, {usage['completion_tokens']} output tokens"
+        )
+    
+    if COMPLETION_CACHE.enabled:
+        print(f"  Completion cache: {COMPLETION_CACHE.hits} hits, {COMPLETION_CACHE.misses} misses")
     
     print("\nRecommendation:")
-    best_model = max(all_results, key=lambda x: x["accuracy"])
+    best_model = ranked[0]
     print(f"  → {best_model['model']['name']} ({best_model['accuracy']:.1f}% accuracy)")
     print(f"  → Model ID: {best_model['model']['id']}")
     
@@ -0,0 +1,261 @@
+"""
+Streaming test-case corpus for the Friday AI eval scripts
+
+Test cases are read lazily from JSONL (optionally gzip-compressed) or Parquet
+files, validated against the TEST_CASES schema, and assigned to shards by a
+hash of their name, so `--shard i/n` picks the same cases on every machine
+regardless of file order. Per-shard result files (JSONL, one record per model
+and test case) double as resume checkpoints and can be merged afterwards.
+
+Parquet support needs pyarrow (pip install pyarrow).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from local_scorers import validate_scorers
+
+# field -> required type; context fields are lists of strings
+REQUIRED_FIELDS = {
+    "name": str,
+    "input": str,
+    "expected_output": str,
+    "context": list,
+    "retrieval_context": list,
+}
+PARQUET_BATCH_ROWS = 1024
+
+
+class CorpusError(ValueError):
+    """A corpus file or record that doesn't match the test-case schema"""
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "i/n" (0 <= i < n) into (index, count)"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise CorpusError(f"Invalid shard {value!r}, expected i/n")
+    if count < 1 or not 0 <= index < count:
+        raise CorpusError(f"Invalid shard {value!r}, need 0 <= i < n")
+    return index, count
+
+
+def shard_of(name: str, count: int) -> int:
+    """Stable shard assignment from the test case name"""
+    digest = hashlib.sha1(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def validate_test_case(record: Dict, where: str) -> Dict:
+    """Check a record against REQUIRED_FIELDS and its local scorer settings; extra fields are kept
+
+    Optional fields set to null (unset Parquet columns, explicit JSON nulls)
+    are treated as absent and dropped from the returned record.
+    """
+    if not isinstance(record, dict):
+        raise CorpusError(f"{where}: expected an object, got {type(record).__name__}")
+    record = {field: value for field, value in record.items() if value is not None or field in REQUIRED_FIELDS}
+    for field, expected in REQUIRED_FIELDS.items():
+        value = record.get(field)
+        if not isinstance(value, expected):
+            raise CorpusError(f"{where}: field {field!r} must be {expected.__name__}")
+        if expected is list and not all(isinstance(item, str) for item in value):
+            raise CorpusError(f"{where}: field {field!r} must be a list of strings")
+    if not record["name"].strip():
+        raise CorpusError(f"{where}: field 'name' must not be empty")
+    try:
+        validate_scorers(record)
+    except ValueError as e:
+        raise CorpusError(f"{where}: {e}")
+    return record
+
+
+def _iter_jsonl(path: str) -> Iterator[Tuple[str, Dict]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            where = f"{path}:{line_number}"
+            try:
+                yield where, json.loads(line)
+            except ValueError as e:
+                raise CorpusError(f"{where}: invalid JSON ({e})")
+
+
+def _iter_parquet(path: str) -> Iterator[Tuple[str, Dict]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise CorpusError(f"{path}: reading Parquet requires pyarrow (pip install pyarrow)")
+
+    row = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+        for record in batch.to_pylist():
+            row += 1
+            yield f"{path}:row {row}", record
+
+
+def iter_records(path: str) -> Iterator[Tuple[str, Dict]]:
+    """Yield (location, raw record) pairs from one corpus file"""
+    if path.endswith(".parquet"):
+        return _iter_parquet(path)
+    if path.endswith((".jsonl", ".jsonl.gz")):
+        return _iter_jsonl(path)
+    raise CorpusError(f"{path}: unsupported corpus format (use .jsonl, .jsonl.gz or .parquet)")
+
+
+def iter_test_cases(paths: Iterable[str], shard: Tuple[int, int] = (0, 1)) -> Iterator[Dict]:
+    """Stream validated test cases belonging to one shard
+
+    Only test case names are kept in memory, to reject duplicates (which
+    would collide in result files).
+    """
+    index, count = shard
+    seen = set()
+    for path in paths:
+        for where, record in iter_records(path):
+            record = validate_test_case(record, where)
+            if record["name"] in seen:
+                raise CorpusError(f"{where}: duplicate test case name {record['name']!r}")
+            seen.add(record["name"])
+            if shard_of(record["name"], count) == index:
+                yield record
+
+
+def batched(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group an iterable into lists of at most `size` items"""
+    batch: List[Dict] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def shard_results_path(path: str, shard: Tuple[int, int]) -> str:
+    """Per-shard variant of a results path, e.g. results.shard-0-of-4.jsonl"""
+    index, count = shard
+    if count == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{index}-of-{count}{ext}"
+
+
+def read_results(path: str) -> Iterator[Dict]:
+    """Yield result records from a results file
+
+    A line that isn't valid JSON (the tail of a run that was killed while
+    writing) is skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def latest_results(paths: Iterable[str]) -> Dict[Tuple[str, str], Dict]:
+    """Last scored record per (model, test case) across result files"""
+    latest: Dict[Tuple[str, str], Dict] = {}
+    for path in paths:
+        for record in read_results(path):
+            if record.get("stage") != "generated":
+                latest[(record["model_id"], record["test_name"])] = record
+    return latest
+
+
+class ResultCheckpoint:
+    """Append-only results file that doubles as a resume checkpoint
+
+    "generated" records hold a model output that hasn't been scored yet;
+    "scored" records are final. With resume=True the existing file is kept:
+    successfully scored pairs count as completed, unscored outputs (including
+    ones whose scoring failed) are reused, and failed generations are retried.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        # (model_id, test_name) -> final record without model output
+        self.completed: Dict[Tuple[str, str], Dict] = {}
+        # (model_id, test_name) -> model output awaiting scoring
+        self.generated: Dict[Tuple[str, str], str] = {}
+
+        resuming = resume and os.path.exists(path)
+        if resuming:
+            self._load()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a" if resuming else "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+        if resuming and self._file.tell() > 0:
+            # Terminate a partially written last line so new records stay parseable
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+
+    def _load(self) -> None:
+        for record in read_results(self.path):
+            key = (record["model_id"], record["test_name"])
+            self.completed.pop(key, None)
+            self.generated.pop(key, None)
+            if record.get("stage") == "generated" or (record.get("error") and record.get("actual_output")):
+                self.generated[key] = record["actual_output"]
+            elif not record.get("error"):
+                self.completed[key] = {k: v for k, v in record.items() if k != "actual_output"}
+
+    def known(self, model_ids: Iterable[str], test_cases: Iterable[Dict]) -> Dict[Tuple[str, str], Dict]:
+        """Checkpointed state for a batch: final records, or pending outputs to score"""
+        known: Dict[Tuple[str, str], Dict] = {}
+        names = [test_case["name"] for test_case in test_cases]
+        for model_id in model_ids:
+            for name in names:
+                key = (model_id, name)
+                if key in self.completed:
+                    known[key] = self.completed[key]
+                elif key in self.generated:
+                    known[key] = {"test_name": name, "actual_output": self.generated[key]}
+        return known
+
+    def append(self, record: Dict) -> None:
+        """Write one record and flush it, so it survives a crash"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def final_records(self) -> List[Dict]:
+        """The last scored record per (model, test case) in the checkpoint"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+        return list(latest_results([self.path]).values())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def merge_results(paths: Iterable[str], output: str) -> List[Dict]:
+    """Merge per-shard result files into one, keeping the last scored record per (model, test case)"""
+    merged = latest_results(paths)
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in merged.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, output)
+    return list(merged.values())
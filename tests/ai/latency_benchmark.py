@@ -0,0 +1,97 @@
+"""
+Streaming latency/throughput benchmark for OpenRouter models
+
+Runs repeated streamed completions per model at a fixed concurrency and
+reports time-to-first-token, end-to-end latency and output tokens/sec
+percentiles, plus error and rate-limit (429) rates. Trials are not retried,
+so failures show up in the rates instead of inflating latency.
+"""
+
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from openrouter_client import OpenRouterClient
+
+DEFAULT_TRIALS = 10
+DEFAULT_CONCURRENCY = 2
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty sample"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_trials(client: OpenRouterClient, payloads: List[Dict], concurrency: int = DEFAULT_CONCURRENCY) -> List[Dict]:
+    """Stream every payload, at most `concurrency` at a time, and return per-trial stats"""
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(executor.map(client.stream, payloads))
+
+
+def summarize_trials(trials: List[Dict]) -> Dict:
+    """Percentiles and rates over one model's trials
+
+    tokens_per_sec is decode throughput: completion tokens over the time
+    after the first token arrived.
+    """
+    ok = [t for t in trials if t["error"] is None and t["latency"] is not None]
+    ttfts = [t["ttft"] for t in ok if t["ttft"] is not None]
+    latencies = [t["latency"] for t in ok]
+    throughputs = [
+        t["completion_tokens"] / (t["latency"] - t["ttft"])
+        for t in ok
+        if t["ttft"] is not None and t["latency"] > t["ttft"]
+    ]
+
+    summary = {
+        "trials": len(trials),
+        "errors": len(trials) - len(ok),
+        "rate_limited": sum(1 for t in trials if t["status"] == 429),
+        "error_rate": (len(trials) - len(ok)) / len(trials) if trials else 0.0,
+        "completion_tokens": sum(t["completion_tokens"] for t in ok),
+    }
+    for name, values in (("ttft", ttfts), ("latency", latencies), ("tokens_per_sec", throughputs)):
+        for pct in PERCENTILES:
+            summary[f"{name}_p{pct}"] = percentile(values, pct)
+    return summary
+
+
+def print_benchmark_table(summaries: Dict[str, Dict]) -> None:
+    """Print percentile tables for TTFT, latency and tokens/sec, one row per model"""
+
+    def fmt(value: Optional[float], unit: str) -> str:
+        return f"{value:8.2f}{unit}" if value is not None else f"{'-':>8} "
+
+    for name, unit, title in (
+        ("ttft", "s", "Time to first token"),
+        ("latency", "s", "Total latency"),
+        ("tokens_per_sec", " ", "Output tokens/sec"),
+    ):
+        print(f"\n{title}:")
+        print(f"  {'Model':25} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for model_name, summary in summaries.items():
+            cells = " ".join(fmt(summary[f"{name}_p{pct}"], unit) for pct in PERCENTILES)
+            print(f"  {model_name:25} {cells}")
+
+    print("\nErrors:")
+    for model_name, summary in summaries.items():
+        print(
+            f"  {model_name:25} {summary['errors']}/{summary['trials']} failed "
+            f"({summary['error_rate']:.0%}), {summary['rate_limited']} rate limited"
+        )
+
+
+def write_report(path: str, report: Dict) -> None:
+    """Write the benchmark report as JSON, creating the directory if needed"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,221 @@
+"""
+Deterministic local scorers for the Friday AI eval scripts
+
+Machine-checkable test cases (exact JSON, specific time slots, required
+patterns) are checked locally in microseconds before any LLM judge runs.
+A test case opts in with a "local_scorers" list, e.g.
+
+    "local_scorers": [{"type": "json_fields", "fields": ["customer", "date"]}],
+    "scoring_mode": "short_circuit",
+
+and "scoring_mode" decides how the local result combines with the judge:
+
+- "complement" (default): a local failure fails the case without calling
+  the judge; otherwise the judge metrics must pass as well.
+- "short_circuit": the local scorers alone decide; the judge is skipped.
+
+New scorers are added with @register_scorer("name").
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+SCORING_MODES = ("complement", "short_circuit")
+DEFAULT_SCORING_MODE = "complement"
+NUMBER_TOLERANCE = 1e-6
+REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+
+# 09:30 or 9.30 style times joined by -, –, — or "til"/"to"
+TIME_SLOT_PATTERN = re.compile(
+    r"\b(\d{1,2})[:.](\d{2})\s*(?:-|–|—|til|to)\s*(\d{1,2})[:.](\d{2})\b",
+    re.IGNORECASE,
+)
+JSON_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+@dataclass
+class LocalScore:
+    """A scorer outcome, shaped like deepeval's MetricData"""
+    name: str
+    score: float
+    success: bool
+    reason: str
+    threshold: float = 1.0
+
+
+Scorer = Callable[[Dict[str, Any], str, Dict[str, Any]], LocalScore]
+SCORERS: Dict[str, Scorer] = {}
+
+
+def register_scorer(name: str) -> Callable[[Scorer], Scorer]:
+    """Register a scorer(config, actual_output, test_case) -> LocalScore"""
+    def decorator(scorer: Scorer) -> Scorer:
+        SCORERS[name] = scorer
+        return scorer
+    return decorator
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """Parse JSON from a model output: the whole text, a ``` fence, or the outermost {...}"""
+    candidates = [text]
+    candidates += JSON_FENCE_PATTERN.findall(text)
+    start, end = text.find("{"), text.rfind("}")
+    if 0 <= start < end:
+        candidates.append(text[start:end + 1])
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate.strip())
+        except ValueError:
+            continue
+    return None
+
+
+def _values_equal(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return expected == actual
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return abs(expected - actual) <= NUMBER_TOLERANCE
+    if isinstance(expected, str) and isinstance(actual, str):
+        return expected.strip() == actual.strip()
+    if isinstance(expected, list) and isinstance(actual, list):
+        return len(expected) == len(actual) and all(map(_values_equal, expected, actual))
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return expected.keys() == actual.keys() and all(_values_equal(v, actual[k]) for k, v in expected.items())
+    return expected == actual
+
+
+@register_scorer("json_fields")
+def score_json_fields(config: Dict[str, Any], actual_output: str, test_case: Dict[str, Any]) -> LocalScore:
+    """Compare JSON fields in the output with "expected" (default: the parsed expected_output)
+
+    "fields" limits the comparison to those keys. Numbers match within a
+    small tolerance, strings after trimming whitespace.
+    """
+    expected = config.get("expected")
+    if expected is None:
+        expected = json.loads(test_case["expected_output"])
+    fields = config.get("fields") or list(expected)
+
+    actual = extract_json(actual_output)
+    if not isinstance(actual, dict):
+        return LocalScore("json_fields", 0.0, False, "No JSON object found in output")
+
+    mismatched = [field for field in fields if not _values_equal(expected.get(field), actual.get(field))]
+    score = (len(fields) - len(mismatched)) / len(fields) if fields else 1.0
+    if mismatched:
+        return LocalScore("json_fields", score, False, f"Mismatched fields: {', '.join(mismatched)}")
+    return LocalScore("json_fields", score, True, f"All {len(fields)} fields match")
+
+
+def regex_flags(letters: str) -> int:
+    """re flags from letters in "imsx", raising ValueError on others"""
+    flags = 0
+    for letter in letters:
+        if letter not in REGEX_FLAGS:
+            raise ValueError(f"unknown regex flag {letter!r}, expected letters from imsx")
+        flags |= REGEX_FLAGS[letter]
+    return flags
+
+
+@register_scorer("regex")
+def score_regex(config: Dict[str, Any], actual_output: str, test_case: Dict[str, Any]) -> LocalScore:
+    """Require "pattern" to match the output (or not to, with "must_match": false)
+
+    "flags" takes letters from "imsx".
+    """
+    flags = regex_flags(config.get("flags", ""))
+    must_match = config.get("must_match", True)
+
+    found = re.search(config["pattern"], actual_output, flags) is not None
+    success = found == must_match
+    verb = "matched" if found else "did not match"
+    return LocalScore(f"regex:{config['pattern']}", 1.0 if success else 0.0, success, f"Pattern {verb}")
+
+
+def _normalize_slot(match) -> str:
+    start_h, start_m, end_h, end_m = match
+    return f"{int(start_h):02d}:{start_m}-{int(end_h):02d}:{end_m}"
+
+
+def find_time_slots(text: str) -> List[str]:
+    """Time ranges mentioned in a text, normalized to HH:MM-HH:MM"""
+    return [_normalize_slot(match) for match in TIME_SLOT_PATTERN.findall(text)]
+
+
+@register_scorer("time_slots")
+def score_time_slots(config: Dict[str, Any], actual_output: str, test_case: Dict[str, Any]) -> LocalScore:
+    """Require every "expected" slot and none of the "forbidden" ones (HH:MM-HH:MM)"""
+    found = set(find_time_slots(actual_output))
+    expected = config.get("expected", [])
+    forbidden = config.get("forbidden", [])
+
+    missing = [slot for slot in expected if slot not in found]
+    present = [slot for slot in forbidden if slot in found]
+    checks = len(expected) + len(forbidden)
+    score = (checks - len(missing) - len(present)) / checks if checks else 1.0
+
+    problems = []
+    if missing:
+        problems.append(f"missing {', '.join(missing)}")
+    if present:
+        problems.append(f"forbidden {', '.join(present)}")
+    if problems:
+        return LocalScore("time_slots", score, False, "; ".join(problems))
+    return LocalScore("time_slots", score, True, f"Slots found: {', '.join(sorted(found)) or 'none'}")
+
+
+def validate_scorers(test_case: Dict[str, Any]) -> None:
+    """Check a test case's scorer settings, raising ValueError on problems"""
+    mode = test_case.get("scoring_mode", DEFAULT_SCORING_MODE)
+    if mode not in SCORING_MODES:
+        raise ValueError(f"scoring_mode must be one of {', '.join(SCORING_MODES)}")
+
+    scorers = test_case.get("local_scorers", [])
+    if not isinstance(scorers, list):
+        raise ValueError("local_scorers must be a list")
+    for config in scorers:
+        if not isinstance(config, dict) or config.get("type") not in SCORERS:
+            raise ValueError(f"unknown local scorer {config!r}")
+        if config["type"] == "regex":
+            _validate_regex(config)
+        elif config["type"] == "json_fields":
+            _validate_json_fields(config, test_case)
+
+
+def _validate_regex(config: Dict[str, Any]) -> None:
+    if not isinstance(config.get("pattern"), str):
+        raise ValueError("regex scorer needs a pattern")
+    flags = config.get("flags", "")
+    if not isinstance(flags, str):
+        raise ValueError("regex scorer flags must be a string of letters from imsx")
+    try:
+        re.compile(config["pattern"], regex_flags(flags))
+    except re.error as e:
+        raise ValueError(f"invalid regex pattern {config['pattern']!r}: {e}")
+
+
+def _validate_json_fields(config: Dict[str, Any], test_case: Dict[str, Any]) -> None:
+    expected = config.get("expected")
+    if expected is None:
+        try:
+            expected = json.loads(test_case.get("expected_output", ""))
+        except ValueError:
+            raise ValueError('json_fields scorer needs "expected" or a JSON expected_output')
+    if not isinstance(expected, dict):
+        raise ValueError("json_fields scorer expects a JSON object")
+
+
+def scoring_mode(test_case: Dict[str, Any]) -> str:
+    """A test case's scoring mode, "complement" unless set"""
+    return test_case.get("scoring_mode", DEFAULT_SCORING_MODE)
+
+
+def run_local_scorers(test_case: Dict[str, Any], actual_output: str) -> List[LocalScore]:
+    """Run a test case's local scorers against one model output"""
+    return [
+        SCORERS[config["type"]](config, actual_output, test_case)
+        for config in test_case.get("local_scorers", [])
+    ]
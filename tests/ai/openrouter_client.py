@@ -0,0 +1,195 @@
+"""
+Pooled, retrying OpenRouter client for the Friday AI eval scripts
+
+Keeps TLS connections alive across calls, applies explicit connect/read
+timeouts, retries 429/5xx and connection errors with jittered exponential
+backoff (honoring Retry-After), and records latency and token usage per call.
+
+Set OPENROUTER_URL to point the client at a local stub server.
+"""
+
+import email.utils
+import json
+import random
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_POOL_SIZE = 16
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class OpenRouterClient:
+    """Thread-safe chat completions client with connection pooling and retries"""
+
+    def __init__(
+        self,
+        api_key: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            **(headers or {}),
+        })
+        # Retries are handled in post() so Retry-After and usage accounting stay in one place
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.calls: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before the next attempt: Retry-After if given, else full-jitter exponential"""
+        if retry_after is not None:
+            return min(retry_after, BACKOFF_MAX_SECONDS)
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def post(self, payload: Dict) -> Dict:
+        """POST a chat completion request and return the decoded response"""
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    self._record(payload, start, attempt + 1, None, None)
+                    raise
+                time.sleep(self._backoff(attempt, None))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, parse_retry_after(response.headers.get("Retry-After"))))
+                attempt += 1
+                continue
+
+            if not response.ok:
+                self._record(payload, start, attempt + 1, response.status_code, None)
+                response.raise_for_status()
+
+            data = response.json()
+            self._record(payload, start, attempt + 1, response.status_code, data.get("usage"))
+            return data
+
+    def stream(self, payload: Dict) -> Dict:
+        """Stream a chat completion and measure it, without retrying
+
+        Returns timing and token stats: ttft (seconds to the first content
+        token), latency (seconds to the end of the stream), completion_tokens
+        (from the final usage chunk, else the number of content chunks),
+        status and error. Failures are reported rather than raised so callers
+        can compute error and 429 rates.
+        """
+        start = time.perf_counter()
+        stats = {"model": payload.get("model"), "ttft": None, "latency": None,
+                 "completion_tokens": 0, "status": None, "error": None}
+        body = {**payload, "stream": True, "usage": {"include": True}}
+        content_chunks = 0
+        usage = None
+
+        try:
+            with self.session.post(self.url, json=body, timeout=self.timeout, stream=True) as response:
+                stats["status"] = response.status_code
+                if not response.ok:
+                    stats["error"] = f"HTTP {response.status_code}"
+                    return stats
+
+                # chunk_size=None yields bytes as they arrive instead of waiting to fill a buffer
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    # Server-sent events; lines starting with ':' are keep-alive comments
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    if "error" in chunk:
+                        stats["error"] = str(chunk["error"].get("message", chunk["error"]))
+                        return stats
+                    if chunk.get("usage"):
+                        usage = chunk["usage"]
+                    for choice in chunk.get("choices", []):
+                        if choice.get("delta", {}).get("content"):
+                            if stats["ttft"] is None:
+                                stats["ttft"] = time.perf_counter() - start
+                            content_chunks += 1
+        except (requests.ConnectionError, requests.Timeout, ValueError) as e:
+            stats["error"] = str(e)
+            return stats
+
+        stats["latency"] = time.perf_counter() - start
+        stats["completion_tokens"] = (usage or {}).get("completion_tokens") or content_chunks
+        self._record(payload, start, 1, stats["status"], usage)
+        return stats
+
+    def _record(self, payload: Dict, start: float, attempts: int,
+                status: Optional[int], usage: Optional[Dict]) -> None:
+        usage = usage or {}
+        with self._lock:
+            self.calls.append({
+                "model": payload.get("model"),
+                "latency": time.perf_counter() - start,
+                "attempts": attempts,
+                "status": status,
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0),
+            })
+
+    def usage_summary(self) -> Dict[str, Dict]:
+        """Aggregate recorded calls per model: count, retries, latency and tokens"""
+        with self._lock:
+            calls = list(self.calls)
+
+        summary: Dict[str, Dict] = {}
+        for model in sorted({c["model"] for c in calls}):
+            model_calls = [c for c in calls if c["model"] == model]
+            latencies = [c["latency"] for c in model_calls]
+            summary[model] = {
+                "calls": len(model_calls),
+                "retries": sum(c["attempts"] - 1 for c in model_calls),
+                "errors": sum(1 for c in model_calls if c["status"] != 200),
+                "latency_p50": statistics.median(latencies),
+                "latency_max": max(latencies),
+                "prompt_tokens": sum(c["prompt_tokens"] for c in model_calls),
+                "completion_tokens": sum(c["completion_tokens"] for c in model_calls),
+            }
+        return summary